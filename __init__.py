@@ -39,7 +39,8 @@ from bpy.app.handlers import persistent
 
 from scribe.renderer import Renderer, get_group, get_hooks
 
-from scribe.hooks import cycles, general
+from scribe.hooks import complexity, cycles, general, hardware, throughput
+from scribe import event_stream, replay, sinks
 
 scribe_renderer = None
 
@@ -52,13 +53,13 @@ def cleanup(scene):
 
 @persistent
 def render_write(scene):
-    # If we are writing a file then we should be writing the stats also.
-    scribe_renderer.can_render = True
+    scribe_renderer.frame_write()
 
 
 @persistent
 def render_cancel(scene):
     """Just cleanup the scene because rendering was canceled."""
+    scribe_renderer.cancel()
     cleanup(scene)
 
 
@@ -98,11 +99,62 @@ class ScribeRenderSettings(bpy.types.PropertyGroup):
         default="render_settings.txt",
         subtype="FILE_NAME"
     )
+    format = bpy.props.EnumProperty(
+        items=[
+            ('text', "Text", "Write the settings report as a text file"),
+            ('none', "None", "Don't write a report, only the enabled logs and streams"),
+        ],
+        description="Format of the settings report",
+        name="Report Format",
+        default='text'
+    )
     advanced_settings = bpy.props.BoolProperty(
         description="Choose which hooks to uses",
         name="Advanced Settings",
         default=False
     )
+    warn_slow_frames = bpy.props.BoolProperty(
+        description="Print a warning to the console as soon as a frame is a lot slower than the ones before it",
+        name="Warn About Slow Frames",
+        default=True
+    )
+    frame_log = bpy.props.BoolProperty(
+        description="Also write a binary log with a record for every frame (.frames next to the output file)",
+        name="Frame Log",
+        default=False
+    )
+    frame_table = bpy.props.BoolProperty(
+        description="Add a table with a row for every frame to the end of the report (uses the frame log)",
+        name="Frame Table",
+        default=False
+    )
+    metrics = bpy.props.BoolProperty(
+        description="Keep an OpenMetrics textfile with the render progress up to date while rendering",
+        name="Metrics File",
+        default=False
+    )
+    metrics_path = bpy.props.StringProperty(
+        description="Path of the metrics file, defaults to a .prom file next to the output file",
+        name="Metrics Path",
+        default="",
+        subtype="FILE_PATH"
+    )
+    metrics_interval = bpy.props.FloatProperty(
+        description="Minimum number of seconds between two writes of the metrics file",
+        name="Metrics Interval",
+        default=5.0,
+        min=0.0
+    )
+    stream = bpy.props.BoolProperty(
+        description="Stream render events as newline-delimited JSON to local subscribers",
+        name="Event Stream",
+        default=False
+    )
+    stream_address = bpy.props.StringProperty(
+        description="Where to listen for subscribers: 'host:port', 'port' or 'unix:/path/to/socket'",
+        name="Stream Address",
+        default="127.0.0.1:7878"
+    )
 
 
 class ScribeRenderPanel(bpy.types.Panel):
@@ -120,6 +172,23 @@ class ScribeRenderPanel(bpy.types.Panel):
         layout = self.layout
         layout.active = context.scene.scribe.enable
         layout.prop(context.scene.scribe, 'filename')
+        layout.prop(context.scene.scribe, 'format')
+        layout.prop(context.scene.scribe, 'warn_slow_frames')
+        layout.prop(context.scene.scribe, 'frame_log')
+        layout.prop(context.scene.scribe, 'frame_table')
+        layout.prop(context.scene.scribe, 'metrics')
+        if context.scene.scribe.metrics:
+            row = layout.row()
+            row.prop(context.scene.scribe, 'metrics_path', text="")
+            row.prop(context.scene.scribe, 'metrics_interval', text="Interval")
+        layout.prop(context.scene.scribe, 'stream')
+        if context.scene.scribe.stream:
+            layout.prop(context.scene.scribe, 'stream_address', text="")
+
+        row = layout.row(align=True)
+        row.operator('scribe.apply_report', text="Compare Report").dry_run = True
+        row.operator('scribe.apply_report', text="Apply Report").dry_run = False
+
         layout.prop(context.scene.scribe, 'advanced_settings')
 
         if not context.scene.scribe.advanced_settings:
@@ -170,6 +239,14 @@ def register():
     # Register the hooks.
     general.register()
     cycles.register()
+    complexity.register()
+    throughput.register()
+    hardware.register()
+
+    # Register the sinks.
+    sinks.register()
+
+    replay.register()
 
 
 def unregister():
@@ -180,6 +257,7 @@ def unregister():
     bpy.app.handlers.render_complete.remove(render_complete)
     bpy.app.handlers.render_pre.remove(render_pre)
     bpy.app.handlers.render_post.remove(render_post)
+    complexity.unregister()
 
     # Remove the property group.
     del bpy.types.Scene.scribe
@@ -188,6 +266,14 @@ def unregister():
     bpy.utils.unregister_class(ScribeRenderPanel)
     bpy.utils.unregister_class(ScribeRenderSettings)
 
+    replay.unregister()
+
+    # Remove the sinks, otherwise re-enabling the add-on would register them twice.
+    sinks.unregister()
+
+    # Disconnect any event stream subscribers.
+    event_stream.stop_server()
+
 
 if __name__ == "__main__":
     try:
@@ -204,4 +290,7 @@ if __name__ == "__main__":
     except AttributeError:  # bpy.types.ScribeRenderSettings doesn't exist.
         print('First time run in current blender instance.')
     finally:
+        # These modules are reused, so their sinks and handlers are still registered.
+        sinks.unregister()
+        complexity.unregister()
         register()
@@ -0,0 +1,193 @@
+"""
+config.py: Override the Scribe settings from the command line or the environment.
+
+Meant for farm renders (blender -b shot.blend -a) where changing the settings saved
+in the .blend isn't practical. Command line arguments go after '--' and win over
+environment variables:
+
+    --scribe / --no-scribe          SCRIBE_ENABLE=1|0
+    --scribe-format text|none       SCRIBE_FORMAT
+    --scribe-filename TEMPLATE      SCRIBE_FILENAME
+    --scribe-hooks GROUP,...        SCRIBE_HOOKS
+    --scribe-sinks SINK,...         SCRIBE_SINKS
+    --scribe-metrics-path PATH      SCRIBE_METRICS_PATH
+    --scribe-stream-address ADDR    SCRIBE_STREAM_ADDRESS
+
+This module doesn't depend on bpy.
+
+Copyright (C) 2017 Isaac Weaver
+Author: Isaac Weaver <wisaac407@gmail.com>
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with this program; if not, write to the Free Software Foundation, Inc.,
+    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+
+import argparse
+import contextlib
+import os
+import socket
+import sys
+
+
+FORMATS = ('text', 'none')
+
+# Sink name -> the setting that enables it.
+SINKS = {
+    'frames': 'frame_log',
+    'metrics': 'metrics',
+    'stream': 'stream',
+}
+
+
+def _split(value):
+    return set(part.strip() for part in value.split(',') if part.strip())
+
+
+def _bool(value):
+    return value.strip().lower() in {'1', 'true', 'yes', 'on'}
+
+
+class _ArgumentParser(argparse.ArgumentParser):
+    """Raise ValueError on bad arguments, the default exits, which would take blender down with it."""
+
+    def error(self, message):
+        raise ValueError(message)
+
+
+def _parser():
+    parser = _ArgumentParser(prog='scribe', add_help=False)
+    parser.add_argument('--scribe', dest='enable', action='store_true', default=None)
+    parser.add_argument('--no-scribe', dest='enable', action='store_false')
+    parser.add_argument('--scribe-format', dest='format', choices=FORMATS)
+    parser.add_argument('--scribe-filename', dest='filename')
+    parser.add_argument('--scribe-hooks', dest='hooks', type=_split)
+    parser.add_argument('--scribe-sinks', dest='sinks', type=_split)
+    parser.add_argument('--scribe-metrics-path', dest='metrics_path')
+    parser.add_argument('--scribe-stream-address', dest='stream_address')
+    return parser
+
+
+def _drop_invalid(parser, argv):
+    """Return argv without the scribe options (and their values) that fail to parse on their own."""
+    kept = []
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        # Options take at most one value, either '--opt=value' or '--opt value'.
+        group = [arg]
+        if arg.startswith('--scribe') and '=' not in arg and i + 1 < len(argv) \
+                and not argv[i + 1].startswith('--'):
+            group.append(argv[i + 1])
+        try:
+            parser.parse_known_args(group)
+        except ValueError:
+            i += len(group)
+            continue
+        kept.append(arg)
+        i += 1
+    return kept
+
+
+def parse_overrides(argv, environ):
+    """
+    Return a dictionary of setting name -> override value.
+
+    The names match the properties of the scene's scribe settings, plus 'format' and
+    'hooks' (a set of hook group or hook idnames to use).
+    """
+    overrides = {}
+
+    # Environment first so the command line wins.
+    if 'SCRIBE_ENABLE' in environ:
+        overrides['enable'] = _bool(environ['SCRIBE_ENABLE'])
+    if 'SCRIBE_FORMAT' in environ:
+        if environ['SCRIBE_FORMAT'] in FORMATS:
+            overrides['format'] = environ['SCRIBE_FORMAT']
+        else:
+            print("Scribe: Ignoring SCRIBE_FORMAT, invalid choice: '%s' (choose from %s)" % (
+                environ['SCRIBE_FORMAT'], ', '.join(FORMATS)))
+    for name in ('filename', 'metrics_path', 'stream_address'):
+        if environ.get('SCRIBE_' + name.upper()):
+            overrides[name] = environ['SCRIBE_' + name.upper()]
+    for name in ('hooks', 'sinks'):
+        if 'SCRIBE_' + name.upper() in environ:
+            overrides[name] = _split(environ['SCRIBE_' + name.upper()])
+
+    parser = _parser()
+    try:
+        args, _ = parser.parse_known_args(argv)
+    except ValueError as e:
+        # Drop the bad option and keep the rest, never fail a render because of an override.
+        print('Scribe: Ignoring invalid command line option: %s' % e)
+        args, _ = parser.parse_known_args(_drop_invalid(parser, argv))
+    for name, value in vars(args).items():
+        if value is not None:
+            overrides[name] = value
+
+    # Sinks are switched on and off by their own settings.
+    sinks = overrides.pop('sinks', None)
+    if sinks is not None:
+        for sink, setting in SINKS.items():
+            overrides[setting] = sink in sinks
+    return overrides
+
+
+_overrides = None
+_forced = {}
+
+
+def get_overrides():
+    """Return the overrides for this process, they're only parsed once."""
+    global _overrides
+    if _overrides is None:
+        argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+        _overrides = parse_overrides(argv, os.environ)
+    if _forced:
+        return dict(_overrides, **_forced)
+    return _overrides
+
+
+@contextlib.contextmanager
+def force(**settings):
+    """Temporarily override settings, winning over the command line and environment."""
+    previous = dict(_forced)
+    _forced.update(settings)
+    try:
+        yield
+    finally:
+        _forced.clear()
+        _forced.update(previous)
+
+
+def expand_path(template, scene_name, blend, frame_start, frame_end):
+    """
+    Expand the tokens in an output path template.
+
+    {node} is the host name, {scene} the scene name, {blend} the .blend file name
+    without its extension, {start} and {end} the frame range and {frames} both
+    (i.e. 0001-0250).
+    """
+    tokens = {
+        'node': socket.gethostname(),
+        'scene': scene_name,
+        'blend': os.path.splitext(os.path.basename(blend))[0] or 'untitled',
+        'start': frame_start,
+        'end': frame_end,
+        'frames': '%04d-%04d' % (frame_start, frame_end),
+    }
+    # Only replace the tokens we know, anything else in braces is left alone.
+    for name, value in tokens.items():
+        template = template.replace('{%s}' % name, str(value))
+    return template
@@ -0,0 +1,398 @@
+"""
+dashboard.py: Generate a static HTML trend dashboard from Scribe render history.
+
+Walks a directory of frame logs (and text reports without a frame log next to
+them) and writes a single self-contained HTML file: seconds per frame over time
+for every shot, the frame time distribution, and markers for regressions and
+settings changes. Frame times are streamed from the memory-mapped logs into
+fixed-size summaries, so memory use doesn't grow with the length of the renders.
+
+This module doesn't depend on bpy, run it with any python 3:
+
+    python dashboard.py /farm/scribe-history -o dashboard.html
+
+Copyright (C) 2017 Isaac Weaver
+Author: Isaac Weaver <wisaac407@gmail.com>
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with this program; if not, write to the Free Software Foundation, Inc.,
+    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+
+import argparse
+import heapq
+import html
+import math
+import os
+import statistics
+import time
+
+try:
+    from scribe.frame_log import FrameLogError, FrameLogReader
+    from scribe.report import read_report
+except ImportError:  # Run as a script, where the scribe package can't be imported.
+    from frame_log import FrameLogError, FrameLogReader
+    from report import read_report
+
+
+# Frame time histogram: log-spaced bins from 0.01s to 10000s.
+HIST_MIN = 0.01
+HIST_BINS = 48
+HIST_PER_DECADE = 8
+
+
+def _bin(seconds):
+    if seconds <= HIST_MIN:
+        return 0
+    return min(int(math.log10(seconds / HIST_MIN) * HIST_PER_DECADE), HIST_BINS - 1)
+
+
+def _bin_start(index):
+    return HIST_MIN * 10 ** (index / HIST_PER_DECADE)
+
+
+class Run:
+    """Summary of a single render, or of all the farm chunks of one render job."""
+
+    def __init__(self, shot, created, path):
+        self.shot = shot
+        self.created = created
+        self.path = path
+        self.title = None  # 'blend / scene' if it's known.
+        self.frames = 0
+        self.total_time = 0.0
+        self.normalized_time = None  # Total frame time normalized by the calibration score, if known.
+        self.frame_ranges = []
+        self.chunks = 1
+        self.settings_hash = None
+        self.histogram = [0] * HIST_BINS
+        self.regression = False
+        self.settings_changed = False
+
+    @property
+    def seconds_per_frame(self):
+        return self.total_time / self.frames if self.frames else 0.0
+
+    @property
+    def normalized(self):
+        if self.normalized_time is None or not self.frames:
+            return None
+        return self.normalized_time / self.frames
+
+    def can_merge(self, other):
+        """True if other looks like another chunk of the same job: same settings, none of the same frames."""
+        if self.settings_hash is None or other.settings_hash != self.settings_hash:
+            return False
+        if not self.frame_ranges or not other.frame_ranges:
+            return False
+        return not any(start <= other_end and other_start <= end
+                       for start, end in self.frame_ranges for other_start, other_end in other.frame_ranges)
+
+    def merge(self, other):
+        """Add the frames of another chunk of the same job to this run."""
+        self.created = min(self.created, other.created)
+        self.frames += other.frames
+        self.total_time += other.total_time
+        if self.normalized_time is None or other.normalized_time is None:
+            self.normalized_time = None  # Only normalized if every chunk is.
+        else:
+            self.normalized_time += other.normalized_time
+        self.frame_ranges.extend(other.frame_ranges)
+        self.chunks += other.chunks
+        self.title = self.title or other.title
+
+    def __lt__(self, other):
+        return self.created < other.created
+
+
+def _shot_name(path):
+    """Shots are keyed by the directory the render was written to, the same for frame logs and reports."""
+    return os.path.basename(os.path.dirname(os.path.abspath(path))) or path
+
+
+def read_frame_log(path, shot=None):
+    with FrameLogReader(path) as reader:
+        meta = reader.meta
+        run = Run(shot or _shot_name(path), meta.get('created') or os.path.getmtime(path), path)
+        run.title = '%s / %s' % (os.path.splitext(os.path.basename(meta.get('blend') or 'untitled'))[0],
+                                 meta.get('scene', '?'))
+        run.settings_hash = meta.get('settings_hash')
+        if 'frame_start' in meta and 'frame_end' in meta:
+            run.frame_ranges.append((meta['frame_start'], meta['frame_end']))
+
+        histogram = run.histogram
+        total = 0.0
+        frame_times = reader.column('frame_time')
+        for seconds in frame_times:
+            total += seconds
+            histogram[_bin(seconds)] += 1
+        run.frames = len(frame_times)
+        run.total_time = total
+        del frame_times  # Release the view before the log is closed.
+
+        # The score is a CPU benchmark, older logs also stored it for GPU renders.
+        score = meta.get('calibration_score')
+        if score and meta.get('devices') == 'CPU':
+            run.normalized_time = total * score
+    return run
+
+
+def read_text_report(path, shot=None):
+    """Read a text report, it only has the totals so the histogram holds the average frame time."""
+    report = read_report(path)
+    total = report.values.get(('General', 'Time'))
+    frame_range = report.values.get(('General', 'Frame Range'))
+    if report.settings_hash is None or total is None or frame_range is None:
+        return None  # Not a Scribe report, or one without the values we need.
+
+    try:
+        total_time = float(total.split('s')[0])
+        frames = int(frame_range.split('Total Frames: ')[1].rstrip(')'))
+        start, end = (int(frame) for frame in frame_range.split('(')[0].split(' - '))
+    except (IndexError, ValueError):
+        return None
+
+    run = Run(shot or _shot_name(path), os.path.getmtime(path), path)
+    run.settings_hash = report.settings_hash
+    run.frame_ranges.append((start, end))
+    run.frames = frames
+    run.total_time = total_time
+    if frames:
+        run.histogram[_bin(total_time / frames)] += frames
+    return run
+
+
+def iter_runs(root):
+    """Yield a Run for every frame log and text report below root, keyed by their directory relative to root."""
+    for dirpath, _, filenames in os.walk(root):
+        logs = set(os.path.splitext(name)[0] for name in filenames if name.endswith('.frames'))
+        shot = os.path.relpath(dirpath, root)
+        if shot == os.curdir:
+            shot = os.path.basename(os.path.abspath(root))
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            base, ext = os.path.splitext(name)
+            try:
+                if ext == '.frames':
+                    yield read_frame_log(path, shot)
+                elif ext == '.txt' and base not in logs:
+                    run = read_text_report(path, shot)
+                    if run is not None:
+                        yield run
+            except (OSError, ValueError, FrameLogError, UnicodeDecodeError) as e:
+                print('Skipping %s: %s' % (path, e))
+
+
+class Shot:
+    """The most recent runs of a single shot plus its overall frame time distribution."""
+
+    def __init__(self, name, max_runs):
+        self.name = name
+        self.max_runs = max_runs
+        self._runs = []  # Min-heap on creation time, so the oldest run is dropped first.
+        self.title = None
+        self.histogram = [0] * HIST_BINS
+        self.total_runs = 0
+
+    def add(self, run):
+        for i, count in enumerate(run.histogram):
+            self.histogram[i] += count
+        run.histogram = None  # Only the shot totals are kept.
+        self.title = self.title or run.title
+
+        # Farm chunks of one job share their settings but not their frames, they're one run. Chunks
+        # cover different frames with different costs, so comparing them to each other is meaningless.
+        # If more than one run would take the chunk, the one closest in time is its job.
+        candidates = [existing for existing in self._runs if existing.can_merge(run)]
+        if candidates:
+            min(candidates, key=lambda existing: abs(existing.created - run.created)).merge(run)
+            heapq.heapify(self._runs)  # The creation time might have changed.
+            return
+
+        self.total_runs += 1
+        if len(self._runs) < self.max_runs:
+            heapq.heappush(self._runs, run)
+        else:
+            heapq.heappushpop(self._runs, run)
+
+    def runs(self, threshold, baseline_runs):
+        """Return the runs in time order with regressions and settings changes marked."""
+        runs = sorted(self._runs)
+        for i, run in enumerate(runs):
+            previous = runs[max(0, i - baseline_runs):i]
+            if previous:
+                # Compare normalized frame times when every run has them, so a slower node isn't a regression.
+                if run.normalized is not None and all(r.normalized is not None for r in previous):
+                    value, baseline = run.normalized, statistics.median(r.normalized for r in previous)
+                else:
+                    value, baseline = run.seconds_per_frame, statistics.median(r.seconds_per_frame for r in previous)
+                run.regression = value > baseline * threshold
+                run.settings_changed = run.settings_hash != previous[-1].settings_hash
+        return runs
+
+
+def _line_chart(runs, width=720, height=220, pad=40):
+    """Return an SVG chart of seconds per frame over time."""
+    if not runs:
+        return ''
+    t0, t1 = runs[0].created, runs[-1].created
+    values = [r.seconds_per_frame for r in runs] + [r.normalized for r in runs if r.normalized]
+    top = max(values) * 1.1 or 1.0
+
+    def x(run):
+        if t1 == t0:
+            return pad + (width - 2 * pad) / 2
+        return pad + (run.created - t0) / (t1 - t0) * (width - 2 * pad)
+
+    def y(value):
+        return height - pad - value / top * (height - 2 * pad)
+
+    parts = ['<svg viewBox="0 0 %d %d" class="chart">' % (width, height)]
+    parts.append('<line x1="%d" y1="%d" x2="%d" y2="%d" class="axis"/>' % (pad, height - pad, width - pad, height - pad))
+    parts.append('<line x1="%d" y1="%d" x2="%d" y2="%d" class="axis"/>' % (pad, pad, pad, height - pad))
+    parts.append('<text x="%d" y="%d" class="label">%.2fs</text>' % (2, pad, top))
+    parts.append('<text x="%d" y="%d" class="label">0s</text>' % (2, height - pad))
+    parts.append('<text x="%d" y="%d" class="label">%s</text>' % (pad, height - 8, _date(t0)))
+    parts.append('<text x="%d" y="%d" class="label" text-anchor="end">%s</text>' % (
+        width - pad, height - 8, _date(t1)))
+
+    for run in runs:
+        if run.settings_changed:
+            parts.append('<line x1="%.1f" y1="%d" x2="%.1f" y2="%d" class="change"><title>Settings changed: %s</title></line>' % (
+                x(run), pad, x(run), height - pad, html.escape(run.settings_hash or '?')))
+
+    points = ' '.join('%.1f,%.1f' % (x(r), y(r.seconds_per_frame)) for r in runs)
+    parts.append('<polyline points="%s" class="raw"/>' % points)
+    normalized = [r for r in runs if r.normalized]
+    if len(normalized) > 1:
+        points = ' '.join('%.1f,%.1f' % (x(r), y(r.normalized)) for r in normalized)
+        parts.append('<polyline points="%s" class="norm"/>' % points)
+
+    for run in runs:
+        parts.append('<circle cx="%.1f" cy="%.1f" r="%d" class="%s"><title>%s: %.2fs/frame, %s frames\n%s</title></circle>' % (
+            x(run), y(run.seconds_per_frame), 5 if run.regression else 3,
+            'regression' if run.regression else 'point', _date(run.created), run.seconds_per_frame,
+            run.frames, html.escape(run.path)))
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+def _histogram_chart(histogram, width=720, height=160, pad=30):
+    """Return an SVG bar chart of the frame time distribution."""
+    used = [i for i, count in enumerate(histogram) if count]
+    if not used:
+        return ''
+    first, last = used[0], used[-1]
+    bins = histogram[first:last + 1]
+    top = max(bins)
+    bar = (width - 2 * pad) / len(bins)
+
+    parts = ['<svg viewBox="0 0 %d %d" class="chart">' % (width, height)]
+    for i, count in enumerate(bins):
+        h = count / top * (height - 2 * pad)
+        parts.append('<rect x="%.1f" y="%.1f" width="%.1f" height="%.1f" class="bar"><title>%.2fs - %.2fs: %s frames</title></rect>' % (
+            pad + i * bar, height - pad - h, max(bar - 1, 1), h,
+            _bin_start(first + i), _bin_start(first + i + 1), count))
+    parts.append('<text x="%d" y="%d" class="label">%.2fs</text>' % (pad, height - 8, _bin_start(first)))
+    parts.append('<text x="%d" y="%d" class="label" text-anchor="end">%.2fs</text>' % (
+        width - pad, height - 8, _bin_start(last + 1)))
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+def _date(timestamp):
+    return time.strftime('%Y-%m-%d %H:%M', time.localtime(timestamp))
+
+
+STYLE = """
+body { font-family: sans-serif; margin: 2em; color: #222; }
+h2 { border-bottom: 1px solid #ccc; }
+.chart { width: 100%; max-width: 720px; display: block; margin-bottom: 1em; }
+.axis { stroke: #888; }
+.label { font-size: 10px; fill: #555; }
+.raw { fill: none; stroke: #2a6fdb; stroke-width: 1.5; }
+.norm { fill: none; stroke: #999; stroke-width: 1; stroke-dasharray: 4 2; }
+.point { fill: #2a6fdb; }
+.regression { fill: #d62728; }
+.change { stroke: #ff9900; stroke-dasharray: 3 3; }
+.bar { fill: #2a6fdb; }
+table { border-collapse: collapse; font-size: 13px; }
+td, th { padding: 2px 8px; text-align: right; }
+tr.regression td { color: #d62728; font-weight: bold; }
+"""
+
+
+def write_dashboard(shots, f, threshold=1.2, baseline_runs=5, recent=10):
+    """Write the dashboard for the given shots to the file object f."""
+    f.write('<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>Scribe render history</title>')
+    f.write('<style>%s</style></head><body>\n' % STYLE)
+    f.write('<h1>Scribe render history</h1>\n<p>Generated %s. Red points are regressions (more than %.0f%% slower '
+            'than the median of the previous %s runs, using normalized frame times when the runs are CPU renders with a '
+            'calibration score), orange lines mark settings changes, the dashed line is the '
+            'frame time normalized by the node calibration score.</p>\n' % (
+                _date(time.time()), (threshold - 1) * 100, baseline_runs))
+
+    for name in sorted(shots):
+        shot = shots[name]
+        runs = shot.runs(threshold, baseline_runs)
+        f.write('<h2>%s</h2>\n<p>' % html.escape(name))
+        if shot.title:
+            f.write('%s, ' % html.escape(shot.title))
+        f.write('%s runs' % shot.total_runs)
+        if shot.total_runs > len(runs):
+            f.write(' (showing the latest %s)' % len(runs))
+        f.write('</p>\n')
+        f.write(_line_chart(runs))
+        f.write(_histogram_chart(shot.histogram))
+
+        f.write('<table><tr><th>Date</th><th>Frames</th><th>Chunks</th><th>Sec/Frame</th><th>Normalized</th>'
+                '<th>Settings</th></tr>\n')
+        for run in reversed(runs[-recent:]):
+            f.write('<tr%s><td>%s</td><td>%s</td><td>%s</td><td>%.2f</td><td>%s</td><td>%s%s</td></tr>\n' % (
+                ' class="regression"' if run.regression else '', _date(run.created), run.frames, run.chunks,
+                run.seconds_per_frame, '%.2f' % run.normalized if run.normalized else '-',
+                html.escape((run.settings_hash or '-')[:10]), ' (changed)' if run.settings_changed else ''))
+        f.write('</table>\n')
+    f.write('</body></html>\n')
+
+
+def build(root, output, max_runs=500, threshold=1.2, baseline_runs=5):
+    """Read the history below root and write the dashboard to output."""
+    shots = {}
+    for run in iter_runs(root):
+        shot = shots.get(run.shot)
+        if shot is None:
+            shot = shots[run.shot] = Shot(run.shot, max_runs)
+        shot.add(run)
+
+    with open(output, 'w', encoding='utf-8') as f:
+        write_dashboard(shots, f, threshold, baseline_runs)
+    return shots
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a static HTML dashboard from Scribe render history.")
+    parser.add_argument('history', help="Directory with frame logs and reports, searched recursively.")
+    parser.add_argument('-o', '--output', default='scribe_dashboard.html', help="HTML file to write.")
+    parser.add_argument('--max-runs', type=int, default=500, help="Number of recent runs kept per shot.")
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help="How much slower than the recent median a run has to be to count as a regression.")
+    args = parser.parse_args(argv)
+
+    shots = build(args.history, args.output, args.max_runs, args.threshold)
+    print('Wrote %s shots to %s' % (len(shots), args.output))
+
+
+if __name__ == '__main__':
+    main()
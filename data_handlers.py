@@ -47,6 +47,11 @@ class DataHandler:
         """Return the formatted data"""
         raise NotImplementedError
 
+    def canonical(self):
+        """Return a stable string of the typed data, used for hashing"""
+        data = self.data
+        return '%s:%r' % (type(data).__name__, data)
+
 
 class StringHandler(DataHandler):
     """String interface"""
@@ -0,0 +1,203 @@
+"""
+event_stream.py: Local server streaming render events as newline-delimited JSON.
+
+The server runs its own asyncio loop on a daemon thread. publish() only hands the
+encoded event over to that loop, so the caller (blender's render handlers) never
+waits on a client. Every client gets a bounded queue; when a slow client falls
+behind, the oldest events are dropped and a single "dropped" event telling it how
+many it missed is sent before the next one.
+
+This module doesn't depend on bpy.
+
+Copyright (C) 2017 Isaac Weaver
+Author: Isaac Weaver <wisaac407@gmail.com>
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with this program; if not, write to the Free Software Foundation, Inc.,
+    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+
+import asyncio
+import collections
+import json
+import os
+import socket
+import threading
+import time
+
+
+def parse_address(address):
+    """
+    Parse an address string into (host, port) or a unix socket path.
+
+    Accepts 'unix:/path/to/socket', 'host:port' or just 'port' (bound to localhost).
+    """
+    if address.startswith('unix:'):
+        if not hasattr(socket, 'AF_UNIX'):
+            raise ValueError("unix sockets aren't supported on this platform")
+        return address[5:]
+    host, _, port = address.rpartition(':')
+    return host or '127.0.0.1', int(port)
+
+
+# asyncio.current_task() is new in Python 3.7, older Blenders ship 3.5.
+_current_task = getattr(asyncio, 'current_task', None) or asyncio.Task.current_task
+
+
+class _Client:
+    """A connected subscriber and the events waiting to be sent to it."""
+
+    def __init__(self, queue_size):
+        self.queue = collections.deque(maxlen=queue_size)
+        self.ready = asyncio.Event()
+        self.dropped = 0
+        self.closed = False
+        self.task = _current_task()
+
+    def close(self):
+        self.closed = True
+        self.ready.set()
+
+    def push(self, line):
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1  # The deque drops the oldest event for us.
+        self.queue.append(line)
+        self.ready.set()
+
+
+class EventServer:
+    """Serve published events to any number of subscribers."""
+
+    def __init__(self, address, queue_size=256):
+        self.address = address
+        self.queue_size = queue_size
+        self._clients = set()
+        self._loop = None
+        self._server = None
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        Start the server thread.
+
+        Raises ValueError for a malformed address and OSError if we can't bind to it.
+        """
+        # Parse in this thread, so a bad address never reaches the server thread.
+        address = parse_address(self.address)
+        ready = threading.Event()
+        error = []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._server = self._loop.run_until_complete(self._start_server(address))
+            except Exception as e:
+                error.append(e)
+                self._loop.close()
+                return
+            finally:
+                # Whatever happens the caller must not be left waiting.
+                ready.set()
+            try:
+                self._loop.run_forever()
+            finally:
+                self._server.close()
+                # Disconnect everyone before closing the loop.
+                tasks = [client.task for client in self._clients]
+                for client in self._clients:
+                    client.close()
+                self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+                self._loop.run_until_complete(self._server.wait_closed())
+                self._loop.close()
+
+        self._thread = threading.Thread(target=run, name='scribe-event-stream', daemon=True)
+        self._thread.start()
+        ready.wait()
+        if error:
+            self._thread = None
+            raise error[0]
+
+    def _start_server(self, address):
+        if isinstance(address, str):
+            if os.path.exists(address):
+                os.remove(address)  # Stale socket from a previous session.
+            return asyncio.start_unix_server(self._handle_client, address)
+        return asyncio.start_server(self._handle_client, *address)
+
+    def stop(self):
+        if not self.running:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(5)
+        self._thread = None
+
+    def publish(self, event, **data):
+        """Send an event to every subscriber, never blocks the calling thread."""
+        if not self.running:
+            return
+        data['event'] = event
+        data.setdefault('time', time.time())
+        line = (json.dumps(data, sort_keys=True) + '\n').encode('utf-8')
+        self._loop.call_soon_threadsafe(self._broadcast, line)
+
+    def _broadcast(self, line):
+        for client in self._clients:
+            client.push(line)
+
+    async def _handle_client(self, reader, writer):
+        client = _Client(self.queue_size)
+        self._clients.add(client)
+        try:
+            while not client.closed:
+                await client.ready.wait()
+                client.ready.clear()
+                while client.queue and not client.closed:
+                    if client.dropped:
+                        writer.write(('{"count": %d, "event": "dropped"}\n' % client.dropped).encode('utf-8'))
+                        client.dropped = 0
+                    writer.write(client.queue.popleft())
+                    await writer.drain()
+        except (ConnectionError, OSError):
+            pass  # The client went away.
+        finally:
+            self._clients.discard(client)
+            writer.close()
+
+
+_server = None
+
+
+def get_server(address):
+    """Return the running server for address, (re)starting it if needed."""
+    global _server
+    if _server is not None and (_server.address != address or not _server.running):
+        _server.stop()
+        _server = None
+    if _server is None:
+        server = EventServer(address)
+        server.start()
+        _server = server
+    return _server
+
+
+def stop_server():
+    global _server
+    if _server is not None:
+        _server.stop()
+        _server = None
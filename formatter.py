@@ -0,0 +1,98 @@
+"""
+formatter.py: Precompiled, streaming report formatter.
+
+The layout of a report (label width, group headers, line prefixes) only depends on
+the set of active hooks, so it's worked out once per hook set and cached. Writing a
+report then streams the lines straight to a file object, which keeps very long
+reports (i.e. with a row for every frame) linear in time and constant in memory.
+
+This module doesn't depend on bpy.
+
+Copyright (C) 2017 Isaac Weaver
+Author: Isaac Weaver <wisaac407@gmail.com>
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with this program; if not, write to the Free Software Foundation, Inc.,
+    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+
+import itertools
+
+
+class ReportLayout:
+    """The precompiled layout of a report for a fixed list of hooks."""
+
+    def __init__(self, hooks, groups):
+        """hooks is the list of hook classes in report order, groups maps group idname -> (label, order)."""
+        width = max([len(hook.hook_label) for hook in hooks] or [0]) + 1
+
+        # Every line is an optional group header followed by the right aligned label.
+        self.prefixes = []
+        lastgroup = ''
+        for hook in hooks:
+            header = ''
+            if hook.hook_group != lastgroup:
+                # No blank lines before the very first group.
+                header = '%s %s:\n%s\n' % ('\n\n' if lastgroup else '', groups[hook.hook_group][0], '=' * 50)
+                lastgroup = hook.hook_group
+            self.prefixes.append('%s%s: ' % (header, hook.hook_label.rjust(width)))
+
+    def write(self, f, results, settings_hash):
+        """Write the report for the results (one per hook, in order) to the file object f."""
+        for prefix, result in zip(self.prefixes, results):
+            f.write(prefix)
+            f.write(str(result))
+            f.write('\n')
+        f.write('\nSettings hash: %s\n' % settings_hash)
+
+
+_layouts = {}
+
+
+def get_layout(hooks, groups):
+    """Return the (cached) layout for the given hook classes."""
+    key = tuple(hooks)
+    layout = _layouts.get(key)
+    if layout is None:
+        layout = _layouts[key] = ReportLayout(hooks, groups)
+    return layout
+
+
+# Column formats for the frame table, by struct format.
+_column_formats = {
+    'q': ('%12s', '%12d'),
+    'd': ('%12s', '%12.4f'),
+}
+
+
+def write_frame_table(f, fields, rows, chunk_size=1024):
+    """
+    Write a table with a row for every frame.
+
+    fields is the list of (name, struct format) pairs of the rows, which are streamed
+    from any iterable (i.e. a FrameLogReader) and written out in chunks.
+    """
+    header_format = ' '.join(_column_formats.get(fmt, ('%12s', '%12s'))[0] for _, fmt in fields)
+    row_format = ' '.join(_column_formats.get(fmt, ('%12s', '%12s'))[1] for _, fmt in fields) + '\n'
+
+    f.write('\n\n Frames:\n%s\n' % ('=' * 50))
+    f.write(header_format % tuple(name[:12] for name, _ in fields))
+    f.write('\n')
+
+    rows = iter(rows)
+    while True:
+        chunk = list(itertools.islice(rows, chunk_size))
+        if not chunk:
+            break
+        f.write(''.join(row_format % tuple(row) for row in chunk))
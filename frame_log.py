@@ -0,0 +1,288 @@
+"""
+frame_log.py: Compact binary per-frame record format and a memory-mapped reader for it.
+
+A frame log is a small header followed by one fixed-width record per frame:
+
+    magic (8 bytes) | version (uint16) | header length (uint32) | JSON header | padding
+    record 0 | record 1 | ...
+
+The JSON header holds the schema (a list of [name, struct format] pairs, one per
+column) and a free-form meta dictionary. Every record is packed little-endian with
+no padding, so frame N lives at a fixed offset and can be read without parsing
+anything else in the file.
+
+This module doesn't depend on bpy so the reader can be used outside of blender.
+
+Copyright (C) 2017 Isaac Weaver
+Author: Isaac Weaver <wisaac407@gmail.com>
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with this program; if not, write to the Free Software Foundation, Inc.,
+    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+
+import bisect
+import json
+import mmap
+import os
+import struct
+import sys
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+MAGIC = b'SCRIBEFL'
+VERSION = 1
+
+_prefix = struct.Struct('<8sHI')  # Magic, version, header length.
+_align = 8  # Records start on an 8 byte boundary.
+
+
+class FrameLogError(Exception):
+    """Raised when a file isn't a valid frame log."""
+
+
+def _record_struct(fields):
+    return struct.Struct('<' + ''.join(fmt for _, fmt in fields))
+
+
+class FrameLogWriter:
+    """Write frame records to a frame log file, one call to write() per frame."""
+
+    def __init__(self, path, fields, meta=None):
+        self.path = path
+        self.fields = [(name, fmt) for name, fmt in fields]
+        self._struct = _record_struct(self.fields)
+
+        header = json.dumps({'fields': self.fields, 'meta': meta or {}}, sort_keys=True).encode('utf-8')
+        # Pad the header with spaces (still valid JSON) so the records are aligned.
+        header += b' ' * (-(_prefix.size + len(header)) % _align)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._file = open(path, 'wb')
+        self._file.write(_prefix.pack(MAGIC, VERSION, len(header)))
+        self._file.write(header)
+
+    def write(self, row):
+        """Append a single frame record, row must match the fields given to __init__."""
+        self._file.write(self._struct.pack(*row))
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _Column:
+    """Read only sequence over a single column, unpacking values as they are accessed."""
+
+    def __init__(self, buf, offset, stride, fmt, length):
+        self._buf = buf
+        self._offset = offset
+        self._stride = stride
+        self._struct = struct.Struct('<' + fmt)
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._length))]
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('column index out of range')
+        return self._struct.unpack_from(self._buf, self._offset + index * self._stride)[0]
+
+    def __iter__(self):
+        for i in range(self._length):
+            yield self._struct.unpack_from(self._buf, self._offset + i * self._stride)[0]
+
+
+class FrameLogReader:
+    """
+    Memory-mapped random access to a frame log.
+
+    Rows are read straight from the mapping so opening even a very large log is
+    cheap; reader[n] is the n-th record and frame(number) looks a record up by
+    frame number. Views returned by column() reference the mapping, so release
+    them before calling close().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Can't map an empty file.
+            self._file.close()
+            raise FrameLogError('%s is empty' % path)
+
+        try:
+            magic, version, header_len = _prefix.unpack_from(self._map, 0)
+        except struct.error:
+            magic, version, header_len = None, None, 0
+        if magic != MAGIC:
+            self.close()
+            raise FrameLogError('%s is not a frame log' % path)
+        if version > VERSION:
+            self.close()
+            raise FrameLogError('%s uses unsupported frame log version %s' % (path, version))
+
+        header = json.loads(self._map[_prefix.size:_prefix.size + header_len].decode('utf-8'))
+        self.fields = [(name, fmt) for name, fmt in header['fields']]
+        self.meta = header['meta']
+        self._names = [name for name, _ in self.fields]
+
+        self._struct = _record_struct(self.fields)
+        self._offset = _prefix.size + header_len
+        # Ignore a trailing partial record (e.g. the render was killed mid-write).
+        self._length = (len(self._map) - self._offset) // self._struct.size
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def complete(self):
+        """
+        False if the log has fewer records than the frame range in its meta data, i.e.
+        the render was cancelled or killed. None if the meta data has no frame range.
+        """
+        try:
+            start, end, step = self.meta['frame_start'], self.meta['frame_end'], self.meta['frame_step']
+        except KeyError:
+            return None
+        return self._length >= (end - start) // max(step, 1) + 1
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError('frame log index out of range')
+        return self._struct.unpack_from(self._map, self._offset + index * self._struct.size)
+
+    def __iter__(self):
+        # unpack_from over the offsets rather than iter_unpack, which would keep a buffer
+        # exported from the mapping (and close() failing) if iteration stops early.
+        unpack_from = self._struct.unpack_from
+        buf = self._map
+        for offset in range(self._offset, self._offset + self._length * self._struct.size, self._struct.size):
+            yield unpack_from(buf, offset)
+
+    def index(self, frame):
+        """Return the record index for the given frame number."""
+        if not self._length:
+            raise KeyError(frame)
+        # Frames are normally written in order with a fixed step so guess first, that's O(1).
+        first = self[0][0]
+        step = self[1][0] - first if self._length > 1 else 1
+        if step > 0 and (frame - first) % step == 0:
+            guess = (frame - first) // step
+            if 0 <= guess < self._length and self[guess][0] == frame:
+                return guess
+
+        # Fall back to a binary search over the frame column.
+        frames = self.column(self._names[0])
+        i = bisect.bisect_left(frames, frame) if step > 0 else -1
+        if 0 <= i < self._length and frames[i] == frame:
+            return i
+        # Out of order log, just scan it.
+        for i, number in enumerate(frames):
+            if number == frame:
+                return i
+        raise KeyError(frame)
+
+    def frame(self, frame):
+        """Return the record for the given frame number."""
+        return self[self.index(frame)]
+
+    def column(self, name):
+        """
+        Return a zero-copy view of a single column.
+
+        This is a numpy array when numpy is available, a strided memoryview when
+        every column has the same width, or a lazy sequence otherwise.
+        """
+        col = self._names.index(name)
+        fmt = self.fields[col][1]
+        offset = self._offset + struct.calcsize('<' + ''.join(f for _, f in self.fields[:col]))
+        stride = self._struct.size
+
+        if numpy is not None:
+            # A plain strided view, a record sized dtype would run past the end of the map for
+            # every column but the first.
+            return numpy.ndarray((self._length,), '<' + fmt, self._map, offset, (stride,))
+
+        size = struct.calcsize('<' + fmt)
+        if sys.byteorder == 'little' and size * len(self.fields) == stride:
+            view = memoryview(self._map)[self._offset:self._offset + self._length * stride]
+            return view.cast(fmt)[col::len(self.fields)]
+
+        return _Column(self._map, offset, stride, fmt, self._length)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check():
+    """Write a small log and read every column back through each view type (run this file to check)."""
+    global numpy
+    import tempfile
+
+    fields = [('frame', 'q'), ('frame_time', 'd'), ('triangles', 'q')]
+    rows = [(frame, frame * 0.5, frame * 1000) for frame in range(1, 11)]
+    path = os.path.join(tempfile.mkdtemp(), 'check.frames')
+    with FrameLogWriter(path, fields, {'frame_start': 1, 'frame_end': 10, 'frame_step': 1}) as writer:
+        for row in rows:
+            writer.write(row)
+
+    available = numpy
+    for use_numpy in (True, False):
+        if use_numpy and available is None:
+            print('numpy not available, skipping the numpy views')
+            continue
+        numpy = available if use_numpy else None
+        try:
+            with FrameLogReader(path) as reader:
+                assert list(reader) == rows and reader.complete
+                for col, (name, _) in enumerate(fields):
+                    column = reader.column(name)
+                    assert [value for value in column] == [row[col] for row in rows], name
+                    del column  # Release the view before the log is closed.
+        finally:
+            numpy = available
+    os.remove(path)
+    print('frame log ok')
+
+
+if __name__ == '__main__':
+    _check()
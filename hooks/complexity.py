@@ -0,0 +1,307 @@
+"""
+hooks/complexity.py: Scene complexity hooks.
+
+Counting the triangles of every object each frame is expensive, so all the hooks
+in this file share a single SceneStats cache that keeps the counts per object and
+only recounts the objects blender tells us have changed since the last frame.
+
+Copyright (C) 2017 Isaac Weaver
+Author: Isaac Weaver <wisaac407@gmail.com>
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with this program; if not, write to the Free Software Foundation, Inc.,
+    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+
+import collections
+import weakref
+from array import array
+
+import bpy
+from bpy.app.handlers import persistent
+
+from scribe.renderer import RenderHook, register_hook, register_group
+from scribe.data_handlers import *
+
+
+class ObjectStats:
+    """Counts for a single object."""
+    triangles = 0
+    instances = 0
+    particles = 0
+    hair = 0
+    sources = {}  # Name of every object this one instances -> number of instances.
+
+
+def _count_triangles(scene, obj):
+    """Return the number of triangles in the evaluated (render) mesh of obj."""
+    try:
+        mesh = obj.to_mesh(scene, True, 'RENDER')
+    except RuntimeError:  # Not geometry (i.e. an empty or a lamp).
+        return 0
+    if mesh is None:
+        return 0
+
+    polys = mesh.polygons
+    loop_totals = array('i', [0]) * len(polys)
+    polys.foreach_get('loop_total', loop_totals)
+    # Every n-gon is made up of n - 2 triangles.
+    triangles = sum(loop_totals) - 2 * len(polys)
+    bpy.data.meshes.remove(mesh)
+    return triangles
+
+
+class SceneStats:
+    """Per-object counts for a scene, kept up to date between frames."""
+
+    def __init__(self, renderer):
+        self.renderer = weakref.ref(renderer)
+        self.scene = renderer.scene
+        self.objects = {}
+        self.hidden = {}  # Objects that aren't rendered themselves but are instanced.
+        self.dirty = set()
+        self.all_dirty = True  # Nothing has been counted yet.
+        self.updated = False  # Set by the update handler, cleared after every frame.
+        self.frame = None
+
+        # Totals for the current frame.
+        self.triangles = 0
+        self.instances = 0
+        self.particles = 0
+        self.hair = 0
+
+    def tag_updates(self):
+        """Remember which objects have changed, only valid during a scene update."""
+        self.updated = True
+        for obj in bpy.data.objects:
+            # Transform only updates can't change any of the counts.
+            if obj.is_updated_data:
+                self.dirty.add(obj.name)
+
+    def _count(self, obj):
+        scene = self.scene
+        stats = ObjectStats()
+        if obj.type in {'MESH', 'CURVE', 'SURFACE', 'META', 'FONT'}:
+            stats.triangles = _count_triangles(scene, obj)
+
+        for psys in obj.particle_systems:
+            count = len(psys.particles) + len(psys.child_particles)
+            if psys.settings.type == 'HAIR':
+                stats.hair += count
+            else:
+                stats.particles += count
+
+        # dupli_type is 'NONE' for particle systems rendering objects or groups, is_duplicator covers those too.
+        if obj.is_duplicator:
+            obj.dupli_list_create(scene, 'RENDER')
+            # Only the unique sources are kept, so the per-frame work doesn't grow with the instances.
+            stats.sources = collections.Counter(dupli.object.name for dupli in obj.dupli_list)
+            obj.dupli_list_clear()
+            stats.instances = sum(stats.sources.values())
+        return stats
+
+    def _lookup(self, cache, obj, recount_all):
+        """Return the cached stats for obj, recounting them if it has changed."""
+        stats = cache.get(obj.name)
+        if stats is None or recount_all or obj.name in self.dirty or \
+                any(name in self.dirty for name in stats.sources):
+            stats = self._count(obj)
+        return stats
+
+    def update(self):
+        """Bring the totals up to date for the current frame."""
+        scene = self.scene
+        if self.frame == scene.frame_current:
+            return
+        self.frame = scene.frame_current
+
+        # If blender didn't send us any updates we can't know what changed, so count everything.
+        recount_all = self.all_dirty or not self.updated
+        objects = {}
+        for obj in scene.objects:
+            if obj.is_visible(scene) and not obj.hide_render:
+                objects[obj.name] = self._lookup(self.objects, obj, recount_all)
+
+        # Instanced geometry counts towards the total too.
+        hidden = {}
+        triangles = instances = particles = hair = 0
+        for stats in objects.values():
+            triangles += stats.triangles
+            instances += stats.instances
+            particles += stats.particles
+            hair += stats.hair
+            for name, count in stats.sources.items():
+                source = objects.get(name) or hidden.get(name)
+                if source is None:
+                    # The source isn't rendered itself (i.e. it's on a hidden layer), count it on its own.
+                    source = hidden[name] = self._lookup(self.hidden, bpy.data.objects[name], recount_all)
+                triangles += count * source.triangles
+        self.objects = objects
+        self.hidden = hidden
+        self.triangles, self.instances, self.particles, self.hair = triangles, instances, particles, hair
+
+        self.dirty.clear()
+        self.all_dirty = False
+        self.updated = False
+
+
+_stats = None  # SceneStats for the current render, if any complexity hook is active.
+
+
+def get_stats(renderer):
+    """Return the SceneStats shared by all the hooks of the given renderer."""
+    global _stats
+    if _stats is None or _stats.renderer() is not renderer:
+        _stats = SceneStats(renderer)
+    return _stats
+
+
+@persistent
+def scene_update(scene):
+    global _stats
+    if _stats is None:
+        return
+    if _stats.renderer() is None:
+        _stats = None  # The render is over, stop tracking updates.
+    elif _stats.scene == scene:
+        _stats.tag_updates()
+
+
+class ComplexityHook(RenderHook):
+    """Base class for hooks that read from the shared SceneStats."""
+    hook_group = 'complexity'
+    hook_volatile = True
+
+    stats = None
+    peak = 0
+    peakframe = 0
+    frames = 0
+
+    def pre_render(self):
+        self.stats = get_stats(self.renderer)
+
+    def value(self):
+        """Return the value this hook tracks from the up to date stats."""
+        raise NotImplementedError
+
+    def post_frame(self):
+        self.stats.update()
+        self.frames += 1
+        value = self.value()
+        if value > self.peak:
+            self.peak = value
+            self.peakframe = self.scene.frame_current
+
+    def frame_result(self):
+        return (self.value(),)
+
+    def post_render(self):
+        if not self.frames:
+            # Still render, there were no frames to count.
+            self.stats.update()
+            return str(self.value())
+        return '%s(Peak: %s on frame %s)' % (self.value(), self.peak, self.peakframe)
+
+
+class ObjectCountHook(RenderHook):
+    """Number of rendered objects."""
+    hook_label = 'Objects'
+    hook_idname = 'cx_objects'
+    hook_group = 'complexity'
+    hook_handler = IntHandler
+    hook_volatile = True
+
+    def post_render(self):
+        return sum(1 for obj in self.scene.objects if obj.is_visible(self.scene) and not obj.hide_render)
+
+
+class TriangleCountHook(ComplexityHook):
+    """Total number of triangles in the evaluated scene, including instances."""
+    hook_label = 'Triangles'
+    hook_idname = 'cx_triangles'
+    hook_handler = StringHandler
+    frame_fields = (('triangles', 'q'),)
+
+    def value(self):
+        return self.stats.triangles
+
+
+class InstanceCountHook(ComplexityHook):
+    """Number of instanced (dupli) objects."""
+    hook_label = 'Instances'
+    hook_idname = 'cx_instances'
+    hook_handler = StringHandler
+    frame_fields = (('instances', 'q'),)
+
+    def value(self):
+        return self.stats.instances
+
+
+class ParticleCountHook(ComplexityHook):
+    """Number of particles, including children."""
+    hook_label = 'Particles'
+    hook_idname = 'cx_particles'
+    hook_handler = StringHandler
+    frame_fields = (('particles', 'q'),)
+
+    def value(self):
+        return self.stats.particles
+
+
+class HairCountHook(ComplexityHook):
+    """Number of hair strands, including children."""
+    hook_label = 'Hair'
+    hook_idname = 'cx_hair'
+    hook_handler = StringHandler
+    frame_fields = (('hair', 'q'),)
+
+    def value(self):
+        return self.stats.hair
+
+
+class ImageTexturesHook(RenderHook):
+    """Number of image textures and how much memory they take up uncompressed."""
+    hook_label = 'Image Textures'
+    hook_idname = 'cx_images'
+    hook_group = 'complexity'
+    hook_handler = StringHandler
+    hook_volatile = True
+
+    def post_render(self):
+        count = 0
+        size = 0
+        for image in bpy.data.images:
+            if image.users == 0 or image.type not in {'IMAGE', 'MULTILAYER'}:
+                continue
+            count += 1
+            width, height = image.size
+            size += width * height * image.channels * (4 if image.is_float else 1)
+        return '%s(%.1fMB)' % (count, size / (1024 * 1024))
+
+
+def register():
+    register_group('complexity', 'Scene Complexity')
+    register_hook(ObjectCountHook)
+    register_hook(TriangleCountHook)
+    register_hook(InstanceCountHook)
+    register_hook(ParticleCountHook)
+    register_hook(HairCountHook)
+    register_hook(ImageTexturesHook)
+
+    bpy.app.handlers.scene_update_post.append(scene_update)
+
+
+def unregister():
+    if scene_update in bpy.app.handlers.scene_update_post:
+        bpy.app.handlers.scene_update_post.remove(scene_update)
@@ -43,6 +43,10 @@ class SeedHook(CyclesHook):
     def post_render(self):
         return self.scene.cycles.seed
 
+    @classmethod
+    def apply(cls, scene, data):
+        return [(scene.cycles, 'seed', int(data))]
+
 
 class SeedAnimatedHook(CyclesHook):
     """Weather or not the seed is animated from frame to frame."""
@@ -54,6 +58,10 @@ class SeedAnimatedHook(CyclesHook):
     def post_render(self):
         return self.scene.cycles.use_animated_seed
 
+    @classmethod
+    def apply(cls, scene, data):
+        return [(scene.cycles, 'use_animated_seed', data)]
+
 
 ## Volume Sampling group
 class VolumeStepHook(CyclesHook):
@@ -66,6 +74,10 @@ class VolumeStepHook(CyclesHook):
     def post_render(self):
         return self.scene.cycles.volume_step_size
 
+    @classmethod
+    def apply(cls, scene, data):
+        return [(scene.cycles, 'volume_step_size', float(data))]
+
 
 class VolumeStepMaxHook(CyclesHook):
     """Maximum number of cycles volume steps."""
@@ -77,6 +89,10 @@ class VolumeStepMaxHook(CyclesHook):
     def post_render(self):
         return self.scene.cycles.volume_max_steps
 
+    @classmethod
+    def apply(cls, scene, data):
+        return [(scene.cycles, 'volume_max_steps', int(data))]
+
 
 ## Performance group.
 class TileSizeHook(CyclesHook):
@@ -84,11 +100,16 @@ class TileSizeHook(CyclesHook):
     hook_label = 'Tile Size'
     hook_idname = 'tile_size'
     hook_group = 'perf'
-    hook_handler = IntHandler
+    hook_handler = StringHandler
 
     def post_render(self):
         return '%sx%s' % (self.scene.render.tile_x, self.scene.render.tile_y)
 
+    @classmethod
+    def apply(cls, scene, data):
+        x, y = data.split('x')
+        return [(scene.render, 'tile_x', int(x)), (scene.render, 'tile_y', int(y))]
+
 
 class TileOrderHook(RenderHook):
     """Cycles tile order."""
@@ -108,6 +129,13 @@ class TileOrderHook(RenderHook):
     def post_render(self):
         return self.orders[self.scene.cycles.tile_order]
 
+    @classmethod
+    def apply(cls, scene, data):
+        for idname, label in cls.orders.items():
+            if label == data:
+                return [(scene.cycles, 'tile_order', idname)]
+        return []
+
 
 class ThreadsModeHook(RenderHook):
     """Which scheme is used to determine the number of threads."""
@@ -123,6 +151,10 @@ class ThreadsModeHook(RenderHook):
     def post_render(self):
         return self.scene.render.threads_mode.capitalize()
 
+    @classmethod
+    def apply(cls, scene, data):
+        return [(scene.render, 'threads_mode', data.upper())]
+
 
 class ThreadsHook(RenderHook):
     """How many threads are being used to render."""
@@ -138,6 +170,10 @@ class ThreadsHook(RenderHook):
     def post_render(self):
         return self.scene.render.threads
 
+    @classmethod
+    def apply(cls, scene, data):
+        return [(scene.render, 'threads', int(data))]
+
 
 ## Bounces group.
 class LBBoundsHook(CyclesHook):
@@ -150,6 +186,12 @@ class LBBoundsHook(CyclesHook):
     def post_render(self):
         return "min: %s, max: %s" % (self.scene.cycles.min_bounces, self.scene.cycles.max_bounces)
 
+    @classmethod
+    def apply(cls, scene, data):
+        min_part, max_part = data.split(',')
+        return [(scene.cycles, 'min_bounces', int(min_part.split(':')[1])),
+                (scene.cycles, 'max_bounces', int(max_part.split(':')[1]))]
+
 
 class LBDiffuseHook(CyclesHook):
     """Maximum number of diffuse reflection bounces."""
@@ -161,6 +203,10 @@ class LBDiffuseHook(CyclesHook):
     def post_render(self):
         return self.scene.cycles.diffuse_bounces
 
+    @classmethod
+    def apply(cls, scene, data):
+        return [(scene.cycles, 'diffuse_bounces', int(data))]
+
 
 class LBGlossyHook(CyclesHook):
     """Maximum number of glossy reflection bounces."""
@@ -172,6 +218,10 @@ class LBGlossyHook(CyclesHook):
     def post_render(self):
         return self.scene.cycles.glossy_bounces
 
+    @classmethod
+    def apply(cls, scene, data):
+        return [(scene.cycles, 'glossy_bounces', int(data))]
+
 
 class LBTransHook(CyclesHook):
     """Maximum number of transmission reflection bounces."""
@@ -183,6 +233,10 @@ class LBTransHook(CyclesHook):
     def post_render(self):
         return self.scene.cycles.transmission_bounces
 
+    @classmethod
+    def apply(cls, scene, data):
+        return [(scene.cycles, 'transmission_bounces', int(data))]
+
 
 class LBVolumeHook(CyclesHook):
     """Maximum number of volume reflection bounces."""
@@ -194,6 +248,10 @@ class LBVolumeHook(CyclesHook):
     def post_render(self):
         return self.scene.cycles.volume_bounces
 
+    @classmethod
+    def apply(cls, scene, data):
+        return [(scene.cycles, 'volume_bounces', int(data))]
+
 
 class LPShadowsHook(CyclesHook):
     """Use transparency of surfaces for rendering shadows."""
@@ -205,6 +263,10 @@ class LPShadowsHook(CyclesHook):
     def post_render(self):
         return self.scene.cycles.use_transparent_shadows
 
+    @classmethod
+    def apply(cls, scene, data):
+        return [(scene.cycles, 'use_transparent_shadows', data)]
+
 
 class LPCausticsReflectiveHook(CyclesHook):
     """Using reflective caustics."""
@@ -216,6 +278,10 @@ class LPCausticsReflectiveHook(CyclesHook):
     def post_render(self):
         return self.scene.cycles.caustics_reflective
 
+    @classmethod
+    def apply(cls, scene, data):
+        return [(scene.cycles, 'caustics_reflective', data)]
+
 
 class LPCausticsRefractiveHook(CyclesHook):
     """Using refractive caustics."""
@@ -227,17 +293,25 @@ class LPCausticsRefractiveHook(CyclesHook):
     def post_render(self):
         return self.scene.cycles.caustics_refractive
 
+    @classmethod
+    def apply(cls, scene, data):
+        return [(scene.cycles, 'caustics_refractive', data)]
+
 
 class LPFilterGlossyHook(CyclesHook):
     """Cycles filter glossy threshold."""
     hook_label = 'Filter Glossy'
     hook_idname = 'lp_filter_glossy'
     hook_group = 'light_paths'
-    hook_handler = BoolHandler
+    hook_handler = NumberHandler
 
     def post_render(self):
         return self.scene.cycles.blur_glossy
 
+    @classmethod
+    def apply(cls, scene, data):
+        return [(scene.cycles, 'blur_glossy', float(data))]
+
 
 ## Sampling group
 class SMSamplesHook(CyclesHook):
@@ -247,12 +321,24 @@ class SMSamplesHook(CyclesHook):
     hook_group = 'sampling'
     hook_handler = IntHandler
 
-    def post_render(self):
-        samples = self.scene.cycles.samples
-        square_samples = self.scene.cycles.use_square_samples
+    @staticmethod
+    def effective_samples(scene):
+        """Return the number of samples per pixel."""
+        samples = scene.cycles.samples
+        square_samples = scene.cycles.use_square_samples
         # If we are using square samples then square the output.
         return samples * samples if square_samples else samples
 
+    def post_render(self):
+        return self.effective_samples(self.scene)
+
+    @classmethod
+    def apply(cls, scene, data):
+        samples = int(data)
+        if scene.cycles.use_square_samples:
+            samples = int(round(samples ** 0.5))
+        return [(scene.cycles, 'samples', samples)]
+
 
 class SMClampDirectHook(CyclesHook):
     """How much we are clamping direct light."""
@@ -264,6 +350,10 @@ class SMClampDirectHook(CyclesHook):
     def post_render(self):
         return self.scene.cycles.sample_clamp_direct
 
+    @classmethod
+    def apply(cls, scene, data):
+        return [(scene.cycles, 'sample_clamp_direct', float(data))]
+
 
 class SMClampIndirectHook(CyclesHook):
     """How much we are clamping indirect light."""
@@ -275,6 +365,10 @@ class SMClampIndirectHook(CyclesHook):
     def post_render(self):
         return self.scene.cycles.sample_clamp_indirect
 
+    @classmethod
+    def apply(cls, scene, data):
+        return [(scene.cycles, 'sample_clamp_indirect', float(data))]
+
 
 def register():
     # Seed group.
@@ -20,6 +20,8 @@ Author: Isaac Weaver <wisaac407@gmail.com>
 """
 
 
+import bisect
+import collections
 import time
 import bpy
 from scribe.renderer import RenderHook, register_hook, register_group
@@ -51,12 +53,26 @@ class RenderEngineHook(RenderHook):
                     if issubclass(engine, bpy.types.RenderEngine) and engine.bl_idname == engine_id:
                         return engine.bl_label
 
+    @classmethod
+    def apply(cls, scene, data):
+        if data == 'Blender Render':
+            return [(scene.render, 'engine', 'BLENDER_RENDER')]
+        elif data == 'Blender Game':
+            return [(scene.render, 'engine', 'BLENDER_GAME')]
+        for typ in dir(bpy.types):
+            engine = getattr(bpy.types, typ)
+            if isinstance(engine, type) and issubclass(engine, bpy.types.RenderEngine) and \
+                    getattr(engine, 'bl_label', None) == data:
+                return [(scene.render, 'engine', engine.bl_idname)]
+        return []  # The render engine isn't available here.
+
 
 class TimeHook(RenderHook):
     """Total render time."""
     hook_label = 'Time'
     hook_idname = 'time'
     hook_handler = StringHandler
+    hook_volatile = True
 
     t = 0
     ft = 0
@@ -79,6 +95,83 @@ class TimeHook(RenderHook):
             self.peakframe = self.scene.frame_current
 
 
+class SlowFrameDetector:
+    """
+    Flag frames that are a lot slower than the frames just before them.
+
+    Keeps a rolling window of recent frame times and compares every new frame to the
+    window's median plus a multiple of its median absolute deviation (MAD). The window
+    has a fixed size so every check is O(1).
+    """
+
+    def __init__(self, window=21, threshold=3.5, min_ratio=1.25, warmup=5):
+        self.window = window
+        self.threshold = threshold  # Number of (scaled) MADs above the median to be flagged.
+        self.min_ratio = min_ratio  # Frames also have to be this much slower than the median.
+        self.warmup = warmup  # Don't flag anything until we've seen this many frames.
+        self._recent = collections.deque()
+        self._sorted = []
+        self.median = 0
+
+    def add(self, frametime):
+        """Add a frame time, return true if it's abnormally slow."""
+        slow = False
+        if len(self._sorted) >= self.warmup:
+            values = self._sorted
+            n = len(values)
+            median = self.median = (values[n // 2] + values[(n - 1) // 2]) / 2
+            deviations = sorted(abs(v - median) for v in values)
+            mad = (deviations[n // 2] + deviations[(n - 1) // 2]) / 2
+            # 1.4826 scales the MAD so it's comparable to a standard deviation.
+            slow = frametime > median + self.threshold * 1.4826 * mad and \
+                frametime > median * self.min_ratio
+
+        self._recent.append(frametime)
+        bisect.insort(self._sorted, frametime)
+        if len(self._recent) > self.window:
+            old = self._recent.popleft()
+            del self._sorted[bisect.bisect_left(self._sorted, old)]
+        return slow
+
+
+class SlowFramesHook(RenderHook):
+    """Frames that took a lot longer to render than the frames around them."""
+    hook_label = 'Slow Frames'
+    hook_idname = 'slow_frames'
+    hook_handler = StringHandler
+    hook_volatile = True
+    frame_fields = (('slow', 'q'),)
+
+    max_listed = 20  # Maximum number of slow frames listed in the report.
+
+    def pre_render(self):
+        self.detector = SlowFrameDetector()
+        self.slow_frames = []
+        self.slow = False
+        self.warn = self.renderer.option('warn_slow_frames')
+
+    def post_frame(self):
+        frametime = self.renderer.last_frame_time
+        self.slow = self.detector.add(frametime)
+        if self.slow:
+            frame = self.scene.frame_current
+            self.slow_frames.append(frame)
+            if self.warn:
+                print('Scribe: Warning: frame %s took %.2fs, %.1fx the recent median of %.2fs' % (
+                    frame, frametime, frametime / self.detector.median, self.detector.median))
+
+    def frame_result(self):
+        return (int(self.slow),)
+
+    def post_render(self):
+        if not self.slow_frames:
+            return 'None'
+        listed = ', '.join(str(f) for f in self.slow_frames[:self.max_listed])
+        if len(self.slow_frames) > self.max_listed:
+            listed += ' and %s more' % (len(self.slow_frames) - self.max_listed)
+        return '%s(Frames: %s)' % (len(self.slow_frames), listed)
+
+
 class FrameRateHook(RenderHook):
     """Frame rate of the rendered animation."""
     hook_label = 'Frame Rate'
@@ -88,18 +181,28 @@ class FrameRateHook(RenderHook):
     def post_render(self):
         return '%sfps' % self.scene.render.fps
 
+    @classmethod
+    def apply(cls, scene, data):
+        return [(scene.render, 'fps', int(data.rstrip('fps')))]
+
 
 class FrameRangeHook(RenderHook):
     """The output frame range."""
     hook_label = 'Frame Range'
     hook_idname = 'framerange'
     hook_handler = StringHandler
+    hook_hashed = False  # Farm chunks of the same shot only differ in their frame range.
 
     def post_render(self):
         start = self.scene.frame_start
         end = self.scene.frame_end
         return "%s - %s(Total Frames: %s)" % (start, end, end - (start-1))
 
+    @classmethod
+    def apply(cls, scene, data):
+        start, end = data.split('(')[0].split(' - ')
+        return [(scene, 'frame_start', int(start)), (scene, 'frame_end', int(end))]
+
 
 ### Resolution group
 class ResolutionHook(RenderHook):
@@ -114,6 +217,11 @@ class ResolutionHook(RenderHook):
         y = self.scene.render.resolution_y
         return "%sx%spx" % (x, y)
 
+    @classmethod
+    def apply(cls, scene, data):
+        x, y = data.rstrip('px').split('x')
+        return [(scene.render, 'resolution_x', int(x)), (scene.render, 'resolution_y', int(y))]
+
 
 class TrueResolutionHook(RenderHook):
     """Actual output resolution."""
@@ -122,17 +230,21 @@ class TrueResolutionHook(RenderHook):
     hook_group = 'resolution'
     hook_handler = StringHandler
 
+    @staticmethod
+    def true_resolution(scene):
+        """Return the (x, y) resolution of the rendered images."""
+        fac = scene.render.resolution_percentage / 100
+        return scene.render.resolution_x * fac, scene.render.resolution_y * fac
+
     def post_render(self):
-        fac = self.scene.render.resolution_percentage / 100
-        x = self.scene.render.resolution_x * fac
-        y = self.scene.render.resolution_y * fac
-        return "%sx%spx" % (x, y)
+        return "%sx%spx" % self.true_resolution(self.scene)
 
 
 def register():
     # General.
     register_hook(RenderEngineHook)
     register_hook(TimeHook)
+    register_hook(SlowFramesHook)
     register_hook(FrameRateHook)
     register_hook(FrameRangeHook)
 
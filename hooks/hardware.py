@@ -0,0 +1,294 @@
+"""
+hooks/hardware.py: Hardware fingerprint of the node doing the rendering.
+
+The fingerprint and the calibration score are worked out once per blender process
+and cached, so they only cost something on the first render.
+
+Copyright (C) 2017 Isaac Weaver
+Author: Isaac Weaver <wisaac407@gmail.com>
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with this program; if not, write to the Free Software Foundation, Inc.,
+    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+
+import ctypes
+import hashlib
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import bpy
+
+from scribe.renderer import RenderHook, register_hook, register_group
+from scribe.data_handlers import *
+
+
+def _sysctl(name):
+    try:
+        return subprocess.check_output(['sysctl', '-n', name]).decode('utf-8').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _cpuinfo():
+    """Return the lines of /proc/cpuinfo split into (key, value) pairs."""
+    try:
+        with open('/proc/cpuinfo') as f:
+            return [tuple(part.strip() for part in line.split(':', 1)) for line in f if ':' in line]
+    except OSError:
+        return []
+
+
+def _cpu_model():
+    for key, value in _cpuinfo():
+        if key == 'model name':
+            return value
+    if sys.platform == 'darwin':
+        model = _sysctl('machdep.cpu.brand_string')
+        if model:
+            return model
+    return platform.processor() or platform.machine() or 'Unknown'
+
+
+def _physical_cores():
+    # Count the unique (physical id, core id) pairs.
+    cores = set()
+    physical_id = None
+    for key, value in _cpuinfo():
+        if key == 'physical id':
+            physical_id = value
+        elif key == 'core id':
+            cores.add((physical_id, value))
+    if cores:
+        return len(cores)
+    if sys.platform == 'darwin':
+        count = _sysctl('hw.physicalcpu')
+        if count:
+            return int(count)
+    return os.cpu_count()
+
+
+def _memory():
+    """Return the total physical memory in bytes, or 0 if we can't tell."""
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        pass
+    if sys.platform == 'darwin':
+        return int(_sysctl('hw.memsize') or 0)
+    if sys.platform == 'win32':
+        class MemoryStatus(ctypes.Structure):
+            _fields_ = [
+                ('dwLength', ctypes.c_ulong),
+                ('dwMemoryLoad', ctypes.c_ulong),
+                ('ullTotalPhys', ctypes.c_ulonglong),
+                ('ullAvailPhys', ctypes.c_ulonglong),
+                ('ullTotalPageFile', ctypes.c_ulonglong),
+                ('ullAvailPageFile', ctypes.c_ulonglong),
+                ('ullTotalVirtual', ctypes.c_ulonglong),
+                ('ullAvailVirtual', ctypes.c_ulonglong),
+                ('sullAvailExtendedVirtual', ctypes.c_ulonglong),
+            ]
+        status = MemoryStatus()
+        status.dwLength = ctypes.sizeof(MemoryStatus)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullTotalPhys
+    return 0
+
+
+_fingerprint = None
+
+
+def fingerprint():
+    """Return a dictionary describing this node, cached for the life of the process."""
+    global _fingerprint
+    if _fingerprint is None:
+        build_hash = bpy.app.build_hash
+        if isinstance(build_hash, bytes):
+            build_hash = build_hash.decode('utf-8', 'replace')
+        _fingerprint = {
+            'cpu_model': _cpu_model(),
+            'physical_cores': _physical_cores(),
+            'logical_cores': os.cpu_count(),
+            'memory': _memory(),
+            'blender_version': bpy.app.version_string,
+            'blender_build_hash': build_hash,
+        }
+    return _fingerprint
+
+
+# Seconds the calibration workload takes on a single core of the reference machine.
+_reference_time = 0.02
+_single_core_score = None
+
+
+def _calibration_workload():
+    h = hashlib.sha256()
+    block = b'\0' * 65536
+    for _ in range(64):
+        h.update(block)
+    x = 0
+    for i in range(200000):
+        x = (x * 31 + i) & 0xffffffff
+    return x
+
+
+def single_core_score():
+    """Return the single core speed of this node relative to the reference machine, cached per process."""
+    global _single_core_score
+    if _single_core_score is None:
+        best = None
+        for _ in range(3):  # Best of three to smooth out any noise.
+            start = time.perf_counter()
+            _calibration_workload()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        _single_core_score = _reference_time / best
+    return _single_core_score
+
+
+def render_cores(scene):
+    """
+    Return the number of cores the render uses.
+
+    That's the thread count for a fixed number of threads, capped at the physical
+    cores since hyper-threads add little, and all the physical cores otherwise.
+    """
+    cores = _physical_cores() or 1
+    if scene.render.threads_mode == 'FIXED':
+        return max(1, min(scene.render.threads, cores))
+    return cores
+
+
+def calibration_score(cores=None):
+    """
+    Return how fast this node is compared to the reference machine.
+
+    The score is the single core speed relative to the reference times the number
+    of cores used (all physical cores by default), so it's only meaningful for CPU
+    renders.
+    """
+    return single_core_score() * (cores or _physical_cores() or 1)
+
+
+def normalize_frame_time(seconds, score):
+    """Return how long a frame that took `seconds` on a node with `score` would take on the reference."""
+    return seconds * score
+
+
+def compute_devices(scene):
+    """Return a string describing the devices cycles renders with."""
+    if scene.render.engine != 'CYCLES' or scene.cycles.device != 'GPU':
+        return 'CPU'
+
+    # Blender 2.78 and later keep the devices in the cycles add-on preferences.
+    prefs = bpy.context.user_preferences
+    cycles_addon = prefs.addons.get('cycles')
+    cycles_prefs = getattr(cycles_addon, 'preferences', None)
+    if cycles_prefs is not None and hasattr(cycles_prefs, 'devices'):
+        device_type = cycles_prefs.compute_device_type
+        devices = [d.name for d in cycles_prefs.devices if d.use and d.type == device_type]
+    else:
+        device_type = prefs.system.compute_device_type
+        devices = [prefs.system.compute_device]
+    return '%s: %s' % (device_type, ', '.join(devices) or 'None')
+
+
+class HardwareHook(RenderHook):
+    """Base class for the hardware hooks, they describe the node rather than the render settings."""
+    hook_group = 'hardware'
+    hook_volatile = True
+
+
+class CPUHook(HardwareHook):
+    """CPU model and number of physical/logical cores."""
+    hook_label = 'CPU'
+    hook_idname = 'hw_cpu'
+    hook_handler = StringHandler
+
+    def post_render(self):
+        info = fingerprint()
+        return '%s(%s cores, %s threads)' % (info['cpu_model'], info['physical_cores'], info['logical_cores'])
+
+
+class MemoryHook(HardwareHook):
+    """Total physical memory."""
+    hook_label = 'Memory'
+    hook_idname = 'hw_memory'
+    hook_handler = StringHandler
+
+    def post_render(self):
+        return '%.1fGB' % (fingerprint()['memory'] / (1024 ** 3))
+
+
+class ComputeDeviceHook(HardwareHook):
+    """Cycles compute device type and the enabled devices."""
+    hook_label = 'Compute Devices'
+    hook_idname = 'hw_devices'
+    hook_handler = StringHandler
+
+    def post_render(self):
+        return compute_devices(self.scene)
+
+
+class BlenderVersionHook(HardwareHook):
+    """Blender version and build hash."""
+    hook_label = 'Blender'
+    hook_idname = 'hw_blender'
+    hook_handler = StringHandler
+
+    def post_render(self):
+        info = fingerprint()
+        return '%s(%s)' % (info['blender_version'], info['blender_build_hash'])
+
+
+class CalibrationHook(HardwareHook):
+    """Speed of this node compared to the reference machine, used to normalize frame times."""
+    hook_label = 'Calibration Score'
+    hook_idname = 'hw_calibration'
+    hook_handler = NumberHandler
+    frame_fields = (('norm_frame_time', 'd'),)
+
+    def pre_render(self):
+        self.devices = compute_devices(self.scene)
+        if self.devices != 'CPU':
+            # The score is a CPU benchmark, it says nothing about GPU render times.
+            self.cores = self.score = None
+            self.frame_fields = ()
+            return
+        # Farm slots and sweeps often render with a fixed number of threads.
+        self.cores = render_cores(self.scene)
+        self.score = calibration_score(self.cores)
+
+    def frame_result(self):
+        if self.score is None:
+            return ()
+        return (normalize_frame_time(self.renderer.last_frame_time, self.score),)
+
+    def post_render(self):
+        if self.score is None:
+            return 'n/a (GPU render)'
+        return round(self.score, 3)
+
+
+def register():
+    register_group('hardware', 'Hardware')
+    register_hook(CPUHook)
+    register_hook(MemoryHook)
+    register_hook(ComputeDeviceHook)
+    register_hook(BlenderVersionHook)
+    register_hook(CalibrationHook)
@@ -0,0 +1,132 @@
+"""
+hooks/throughput.py: Render cost normalized by resolution and sample count.
+
+Copyright (C) 2017 Isaac Weaver
+Author: Isaac Weaver <wisaac407@gmail.com>
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with this program; if not, write to the Free Software Foundation, Inc.,
+    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+
+import statistics
+from array import array
+
+from scribe.renderer import RenderHook, register_hook, register_group
+from scribe.data_handlers import *
+from scribe.hooks.general import TrueResolutionHook
+from scribe.hooks.cycles import CyclesHook, SMSamplesHook
+
+
+class ThroughputHook(RenderHook):
+    """
+    Base class for throughput hooks.
+
+    Every frame's work is divided by its render time, the report shows the value for
+    the whole render and lists the frames that are a lot worse than the median.
+    """
+    hook_group = 'throughput'
+    hook_handler = StringHandler
+    hook_volatile = True
+
+    unit = ''
+    higher_is_better = True
+    outlier_factor = 1.5  # How much worse than the median a frame has to be to get flagged.
+    max_listed = 10  # Maximum number of outlier frames listed in the report.
+
+    def pre_render(self):
+        self.frames = array('q')
+        self.values = array('d')
+        self.total_work = 0
+        self.total_time = 0
+
+    def work(self):
+        """Return the amount of work done in a single frame."""
+        raise NotImplementedError
+
+    def rate(self, work, seconds):
+        """Return the metric for the given amount of work done in seconds."""
+        return work / seconds if self.higher_is_better else seconds / work
+
+    def post_frame(self):
+        work = self.work()
+        seconds = self.renderer.last_frame_time
+        self.total_work += work
+        self.total_time += seconds
+        self.frames.append(self.scene.frame_current)
+        self.values.append(self.rate(work, seconds) if work and seconds else 0.0)
+
+    def frame_result(self):
+        return (self.values[-1] if self.values else 0.0,)
+
+    def outliers(self, median):
+        if self.higher_is_better:
+            return [f for f, v in zip(self.frames, self.values) if v * self.outlier_factor < median]
+        return [f for f, v in zip(self.frames, self.values) if v > median * self.outlier_factor]
+
+    def post_render(self):
+        if not self.total_work or not self.total_time:
+            return 'Unknown'
+
+        overall = self.rate(self.total_work, self.total_time)
+        median = statistics.median(self.values)
+        s = '%.3f%s(Median: %.3f%s' % (overall, self.unit, median, self.unit)
+
+        outliers = self.outliers(median)
+        if outliers:
+            listed = ', '.join(str(f) for f in outliers[:self.max_listed])
+            if len(outliers) > self.max_listed:
+                listed += ' and %s more' % (len(outliers) - self.max_listed)
+            s += ', slow frames: %s' % listed
+        return s + ')'
+
+
+class PixelRateHook(ThroughputHook):
+    """Megapixels rendered per second."""
+    hook_label = 'Pixel Rate'
+    hook_idname = 'tp_pixel_rate'
+    unit = 'MP/s'
+    frame_fields = (('megapixels_per_sec', 'd'),)
+
+    def work(self):
+        x, y = TrueResolutionHook.true_resolution(self.scene)
+        return x * y / 1e6
+
+
+class SampleRateHook(CyclesHook, ThroughputHook):
+    """Millions of samples times pixels rendered per second."""
+    hook_label = 'Sample Rate'
+    hook_idname = 'tp_sample_rate'
+    unit = 'M samples*px/s'
+    frame_fields = (('msamples_px_per_sec', 'd'),)
+
+    def work(self):
+        x, y = TrueResolutionHook.true_resolution(self.scene)
+        return x * y * SMSamplesHook.effective_samples(self.scene) / 1e6
+
+
+class SampleCostHook(SampleRateHook):
+    """Seconds it takes to render a million samples (samples times pixels)."""
+    hook_label = 'Sample Cost'
+    hook_idname = 'tp_sample_cost'
+    unit = 's/M samples'
+    higher_is_better = False
+    frame_fields = (('sec_per_msample', 'd'),)
+
+
+def register():
+    register_group('throughput', 'Throughput')
+    register_hook(PixelRateHook)
+    register_hook(SampleRateHook)
+    register_hook(SampleCostHook)
@@ -0,0 +1,121 @@
+"""
+metrics.py: OpenMetrics/Prometheus textfile writer for live render metrics.
+
+The file is meant to be picked up by the node-exporter textfile collector, so it
+is always replaced atomically and never contains timestamps.
+
+This module doesn't depend on bpy.
+
+Copyright (C) 2017 Isaac Weaver
+Author: Isaac Weaver <wisaac407@gmail.com>
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with this program; if not, write to the Free Software Foundation, Inc.,
+    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+
+import os
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows.
+    resource = None
+
+
+# (name, help) for every metric we write, in output order.
+METRICS = (
+    ('scribe_rendering', 'Whether a render is currently running.'),
+    ('scribe_frame_current', 'Frame that was rendered last.'),
+    ('scribe_frames_done', 'Number of frames rendered so far.'),
+    ('scribe_frames_total', 'Number of frames in the render.'),
+    ('scribe_frame_seconds_last', 'Render time of the last frame in seconds.'),
+    ('scribe_frame_seconds_average', 'Average render time per frame in seconds.'),
+    ('scribe_eta_seconds', 'Estimated time until the render is done in seconds.'),
+    ('scribe_rss_bytes', 'Resident memory of the blender process in bytes.'),
+)
+
+try:
+    _page_size = os.sysconf('SC_PAGE_SIZE')
+except (AttributeError, ValueError):
+    _page_size = 4096
+
+
+def current_rss():
+    """Return the resident memory of this process in bytes, or None if we can't tell."""
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _page_size
+    except (OSError, IndexError, ValueError):
+        pass
+    if resource is not None:
+        # Not available as a current value on this platform, fall back to the peak.
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == 'darwin' else rss * 1024
+    return None
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+class MetricsWriter:
+    """
+    Write render progress to an OpenMetrics textfile.
+
+    Check due() before gathering the values for update() so per-frame callers only
+    pay for a write once every `interval` seconds.
+    """
+
+    def __init__(self, path, labels=None, interval=5.0):
+        self.path = path
+        self.interval = interval
+        self._last_write = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        label_str = ','.join('%s="%s"' % (k, _escape(v)) for k, v in sorted((labels or {}).items()))
+        label_str = '{%s}' % label_str if label_str else ''
+
+        # Precompile everything but the values so a write only has to join strings.
+        self._prefixes = []
+        for name, help_text in METRICS:
+            # Strip the scribe_ prefix so values can be passed as keywords.
+            self._prefixes.append((name[7:], '# HELP %s %s\n# TYPE %s gauge\n%s%s ' % (
+                name, help_text, name, name, label_str)))
+
+    def due(self):
+        """Return true if at least `interval` seconds have passed since the last write."""
+        return time.time() - self._last_write >= self.interval
+
+    def update(self, **values):
+        """Write the given metric values (keyword per metric name without the scribe_ prefix)."""
+        self._last_write = time.time()
+
+        parts = []
+        for key, prefix in self._prefixes:
+            value = values.get(key)
+            if value is not None:
+                parts.append('%s%r\n' % (prefix, float(value)))
+        parts.append('# EOF\n')
+
+        # Write to a temporary file in the same directory and move it into place so a
+        # scrape never sees a half-written file.
+        tmp = '%s.%s.tmp' % (self.path, os.getpid())
+        with open(tmp, 'w') as f:
+            f.write(''.join(parts))
+        os.replace(tmp, self.path)
@@ -20,9 +20,17 @@ Author: Isaac Weaver <wisaac407@gmail.com>
 """
 
 
+import hashlib
+import io
 import os
+import sys
+import time
 import bpy
 
+from scribe.config import expand_path, get_overrides
+from scribe.formatter import get_layout, write_frame_table
+from scribe.frame_log import FrameLogReader
+
 
 class RenderHook:
     """
@@ -35,14 +43,21 @@ class RenderHook:
     hook_idname = ''  # This is how other hooks can reference this one.
     hook_group = 'default'  # Hooks can be assigned to layout groups.
     hook_handler = None
+    hook_volatile = False  # Volatile hooks (timings, hardware, ...) are left out of the settings hash.
+    hook_hashed = True  # False for settings of the job rather than the shot (frame range), neither hashed nor applied.
+
+    # Per-frame values this hook reports as (name, struct format) pairs, i.e. (('triangles', 'q'),).
+    # Stick to 8 byte formats ('q' or 'd') so frame log columns can be viewed without copying.
+    frame_fields = ()
 
     @classmethod
     def poll(cls, context):
         """Return true if this hook can be used with current context."""
         return True
 
-    def __init__(self, scene):
-        self.scene = scene
+    def __init__(self, renderer):
+        self.renderer = renderer
+        self.scene = renderer.scene
         self.handler = self.hook_handler()
 
     def get_result(self):
@@ -63,14 +78,59 @@ class RenderHook:
         # Every instance should implement this function.
         raise NotImplementedError
 
+    @classmethod
+    def apply(cls, scene, data):
+        """
+        Inverse of post_render, return the (owner, attribute, value) assignments that restore data.
+
+        Hooks that can't be applied back onto a scene (timings etc.) don't implement this.
+        """
+        raise NotImplementedError
+
     def pre_frame(self):
         """Called before the rendering of each frame."""
 
     def post_frame(self):
         """Called after the rendering of each frame"""
 
+    def frame_result(self):
+        """Return a tuple of values matching frame_fields for the frame that just finished."""
+        return ()
+
+
+class RenderSink:
+    """
+    Base class for everything that consumes per-frame records while rendering.
+
+    Sinks are created when the render starts, if their poll function allows it.
+    """
+
+    @classmethod
+    def poll(cls, renderer):
+        """Return true if this sink should be used for the current render."""
+        return True
+
+    def __init__(self, renderer):
+        self.renderer = renderer
+
+    def frame_begin(self):
+        """Called before the rendering of each frame."""
+
+    def frame_write(self):
+        """Called after each frame has been written to disk."""
+
+    def frame_complete(self, row):
+        """Called after each frame with the record matching renderer.frame_fields."""
+
+    def render_complete(self):
+        """Called once all the frames have been rendered and written."""
+
+    def render_cancel(self):
+        """Called instead of render_complete when the render didn't finish."""
+
 
 _registered_hooks = []
+_registered_sinks = []
 _registered_groups = {'default': ('General', 0)}
 _group_id = 1
 
@@ -93,6 +153,17 @@ def register_hook(hook):
     ))
 
 
+def register_sink(sink):
+    """Add sink to the list of available sinks."""
+    _registered_sinks.append(sink)
+
+
+def unregister_sink(sink):
+    """Remove sink from the list of available sinks."""
+    if sink in _registered_sinks:
+        _registered_sinks.remove(sink)
+
+
 def register_group(idname, label):
     global _group_id
     _registered_groups[idname] = (label, _group_id)
@@ -107,62 +178,188 @@ def get_group(idname):
     return _registered_groups[idname]
 
 
+def get_option(scene, name, overrides=None):
+    """Return the value of a scribe setting of scene, overrides default to the ones of this process."""
+    if overrides is None:
+        overrides = get_overrides()
+    if name in overrides:
+        return overrides[name]
+    return getattr(scene.scribe, name)
+
+
+def output_path(scene, ext=None, overrides=None):
+    """Return the path of the output file of scene, optionally with its extension replaced by ext."""
+    render_dir = bpy.path.abspath(scene.render.filepath)
+    filename = expand_path(get_option(scene, 'filename', overrides), scene.name, bpy.data.filepath,
+                           scene.frame_start, scene.frame_end)
+    if ext is not None:
+        filename = os.path.splitext(filename)[0] + ext
+    return os.path.join(render_dir, filename)
+
+
 class Renderer:
     """Hold the current state of the render, ie if currently rendering."""
 
     def __init__(self, scene):
         self.scene = scene
         self._active_hooks = []
+        self._sinks = []
         self.can_render = False  # Weather or not the settings should be rendered.
 
+        # Per-frame state.
+        self.frame_start_time = 0
+        self.last_frame_time = 0
+        self.frames_done = 0
+
+        self._settings = None
+        self._settings_hash = None
+
+        # Settings given on the command line or in the environment win over the ones in the scene.
+        self.overrides = get_overrides()
+        self.enabled = self.option('enable')
+        if not self.enabled:
+            self.frame_fields = []
+            return
+
         # For every active hook, initialize it with the current scene, run the pre_render function
         # and add it to the active hooks list.
 
         advanced_settings = scene.scribe.advanced_settings
+        hook_names = self.overrides.get('hooks')
         for hook in _registered_hooks:
+            if hook_names is not None:
+                # Hooks can be picked by group or by idname.
+                active = hook.hook_group in hook_names or hook.hook_idname in hook_names
+            else:
+                active = not advanced_settings or getattr(scene.scribe, hook.hook_idname)
+
             # Only add it if it's active and available in the current context.
-            if (not advanced_settings or getattr(scene.scribe, hook.hook_idname)) and hook.poll(bpy.context):
-                hook = hook(scene)
+            if active and hook.poll(bpy.context):
+                hook = hook(self)
                 hook.pre_render()
                 self._active_hooks.append(hook)
 
+        # Every frame record starts with the frame number and how long it took to render.
+        self.frame_fields = [('frame', 'q'), ('frame_time', 'd')]
+        for hook in self._active_hooks:
+            self.frame_fields.extend(hook.frame_fields)
+
+        for sink in _registered_sinks:
+            if sink.poll(self):
+                self._sinks.append(sink(self))
+
+    def option(self, name):
+        """Return the value of a scribe setting, taking the command line and environment into account."""
+        return get_option(self.scene, name, self.overrides)
+
+    def get_hook(self, idname):
+        """Return the active hook with the given idname, or None if it isn't active."""
+        for hook in self._active_hooks:
+            if hook.hook_idname == idname:
+                return hook
+        return None
+
+    def _setting_handlers(self):
+        """Return (hook, handler) for every non-volatile hook in idname order."""
+        if self._settings is None:
+            self._settings = []
+            for hook in sorted(self._active_hooks, key=lambda hook: hook.hook_idname):
+                if hook.hook_volatile:
+                    continue
+                handler = hook.hook_handler()
+                handler.data = hook.post_render()
+                self._settings.append((hook, handler))
+        return self._settings
+
+    def settings(self):
+        """Return a dictionary mapping idname -> dumped value for all the captured settings."""
+        return dict((hook.hook_idname, str(handler.dump())) for hook, handler in self._setting_handlers())
+
+    def settings_hash(self):
+        """
+        Return a stable hash of all the captured setting values.
+
+        Only non-volatile, hashed hooks are included, in idname order, using the typed
+        data of their handlers so identical configurations always hash the same. The
+        frame range isn't hashed, so every farm chunk of a shot gets the same hash.
+        """
+        if self._settings_hash is None:
+            h = hashlib.sha1()
+            for hook, handler in self._setting_handlers():
+                if hook.hook_hashed:
+                    h.update(('%s=%s\n' % (hook.hook_idname, handler.canonical())).encode('utf-8'))
+            self._settings_hash = h.hexdigest()
+        return self._settings_hash
+
+    def output_path(self, ext=None):
+        """Return the path of the output file, optionally with its extension replaced by ext."""
+        return output_path(self.scene, ext, self.overrides)
+
     def render(self):
         # Return if we can't render.
-        if not self.can_render:
+        # The render finished either way, even if it didn't write any files (i.e. a still render).
+        for sink in self._sinks:
+            sink.render_complete()
+
+        # Only renders that wrote files get a report.
+        if not self.can_render or not self.enabled or self.option('format') == 'none':
             return
+
         # Get the file paths.
-        render_dir = bpy.path.abspath(self.scene.render.filepath)
-        path = os.path.join(render_dir, self.scene.scribe.filename)
+        path = self.output_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
 
         ### Collect all the data.
-        s = self.format_render_data()
-        print(s)
+        results = [hook.get_result() for hook in self._active_hooks]
+        self.write_render_data(sys.stdout, results)
 
         ### Write the data to the info file.
         with open(path, 'w') as f:
-            f.write(s)
+            self.write_render_data(f, results)
+            if self.option('frame_table'):
+                # The frame rows are streamed back from the frame log, they're never all in memory.
+                log_path = self.output_path('.frames')
+                if os.path.exists(log_path):
+                    with FrameLogReader(log_path) as reader:
+                        write_frame_table(f, reader.fields, reader)
+
+    def cancel(self):
+        for sink in self._sinks:
+            sink.render_cancel()
 
     def frame_begin(self):
+        self.frame_start_time = time.time()
         for hook in self._active_hooks:
             hook.pre_frame()
 
+        for sink in self._sinks:
+            sink.frame_begin()
+
+    def frame_write(self):
+        # If we are writing a file then we should be writing the stats also.
+        self.can_render = True
+
+        for sink in self._sinks:
+            sink.frame_write()
+
     def frame_complete(self):
+        self.last_frame_time = time.time() - self.frame_start_time
+        self.frames_done += 1
+
+        row = [self.scene.frame_current, self.last_frame_time]
         for hook in self._active_hooks:
             hook.post_frame()
+            row.extend(hook.frame_result())
 
-    def format_render_data(self):
-        maxlen = 0
-        for hook in self._active_hooks:
-            if len(hook.hook_label) > maxlen:
-                maxlen = len(hook.hook_label)
-        template = '{name:>%s}: {data}' % (maxlen + 1)
+        for sink in self._sinks:
+            sink.frame_complete(row)
 
-        s = ""
-        lastgroup = ''
-        for hook in self._active_hooks:
-            if hook.hook_group != lastgroup:
-                s += '\n\n %s:\n%s\n' % (_registered_groups[hook.hook_group][0], '='*50)
-                lastgroup = hook.hook_group
-            s += template.format(name=hook.hook_label, data=hook.get_result())
-            s += '\n'
-        return s[2:]  # Cut out the first new line character.
+    def write_render_data(self, f, results):
+        """Stream the report for the given hook results to the file object f."""
+        layout = get_layout([type(hook) for hook in self._active_hooks], _registered_groups)
+        layout.write(f, results, self.settings_hash())
+
+    def format_render_data(self):
+        f = io.StringIO()
+        self.write_render_data(f, [hook.get_result() for hook in self._active_hooks])
+        return f.getvalue()
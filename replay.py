@@ -0,0 +1,161 @@
+"""
+replay.py: Apply the settings stored in a report or frame log back onto a scene.
+
+Copyright (C) 2017 Isaac Weaver
+Author: Isaac Weaver <wisaac407@gmail.com>
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with this program; if not, write to the Free Software Foundation, Inc.,
+    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+
+from collections import OrderedDict
+
+import bpy
+
+from scribe.data_handlers import BoolHandler, NumberHandler
+from scribe.renderer import get_group, get_hooks
+from scribe.report import read_report
+from scribe.frame_log import FrameLogError
+
+
+class Change:
+    """A single property write needed to make the scene match a report."""
+
+    def __init__(self, hook, owner, attribute, current, value):
+        self.hook = hook
+        self.owner = owner
+        self.attribute = attribute
+        self.current = current
+        self.value = value
+
+    @property
+    def path(self):
+        owner_path = self.owner.path_from_id()
+        return '%s.%s' % (owner_path, self.attribute) if owner_path else self.attribute
+
+    def __str__(self):
+        return '%s: %s -> %s' % (self.path, self.current, self.value)
+
+
+def load_settings(path):
+    """Return the settings stored in the report or frame log at path as an idname -> raw value dictionary."""
+    report = read_report(path)
+    settings = OrderedDict(report.settings)
+
+    # Text reports only have the labels, look the hooks up by their group and label.
+    labels = dict(((get_group(hook.hook_group)[0], hook.hook_label), hook.hook_idname) for hook in get_hooks())
+    for key, raw in report.values.items():
+        idname = labels.get(key)
+        if idname is not None:
+            settings.setdefault(idname, raw)
+    return settings
+
+
+def _validate(handler_class, raw):
+    """
+    Raise ValueError if raw isn't a valid value for handler_class.
+
+    The handlers fall back to a default (0 or False) for values they can't read,
+    which must never be written to the scene.
+    """
+    if issubclass(handler_class, NumberHandler):
+        handler_class.number_type(raw)
+    elif issubclass(handler_class, BoolHandler) and raw not in ('True', 'False'):
+        raise ValueError(raw)
+
+
+def plan(scene, settings):
+    """Return the list of changes needed to make scene match settings, without changing anything."""
+    changes = []
+    for hook in get_hooks():
+        # Unhashed values (the frame range) describe the job, not the configuration, leave them alone.
+        if hook.hook_volatile or not hook.hook_hashed or hook.hook_idname not in settings:
+            continue
+
+        handler = hook.hook_handler()
+        try:
+            _validate(hook.hook_handler, settings[hook.hook_idname])
+            handler.load(settings[hook.hook_idname])
+            assignments = hook.apply(scene, handler.data)
+        except NotImplementedError:
+            continue  # Derived values like the true resolution can't be applied.
+        except (ValueError, IndexError):
+            print("Scribe: Couldn't read the value of '%s' (%r), skipping it." % (
+                hook.hook_label, settings[hook.hook_idname]))
+            continue
+
+        for owner, attribute, value in assignments:
+            current = getattr(owner, attribute)
+            # Skip writes that wouldn't change anything, they still trigger updates.
+            if current != value:
+                changes.append(Change(hook, owner, attribute, current, value))
+    return changes
+
+
+def apply_changes(scene, changes):
+    """Write all the changes in one go and update the scene once at the end."""
+    for change in changes:
+        setattr(change.owner, change.attribute, change.value)
+    scene.update()
+
+
+class ScribeApplyReport(bpy.types.Operator):
+    """Apply the settings stored in a Scribe report or frame log to the scene"""
+    bl_idname = 'scribe.apply_report'
+    bl_label = "Apply Scribe Report"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filepath = bpy.props.StringProperty(
+        subtype='FILE_PATH'
+    )
+    dry_run = bpy.props.BoolProperty(
+        description="Only list the settings that differ from the report, don't change anything",
+        name="Dry Run",
+        default=True
+    )
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        try:
+            settings = load_settings(bpy.path.abspath(self.filepath))
+        except (OSError, FrameLogError) as e:
+            self.report({'ERROR'}, "Couldn't read the report: %s" % e)
+            return {'CANCELLED'}
+
+        changes = plan(context.scene, settings)
+        if not changes:
+            self.report({'INFO'}, "The scene already matches the report.")
+            return {'FINISHED'}
+
+        for change in changes:
+            print('Scribe: %s' % change)
+
+        if self.dry_run:
+            self.report({'INFO'}, "%s settings differ from the report (see the console)." % len(changes))
+        else:
+            apply_changes(context.scene, changes)
+            self.report({'INFO'}, "Applied %s settings from the report." % len(changes))
+        return {'FINISHED'}
+
+
+def register():
+    bpy.utils.register_class(ScribeApplyReport)
+
+
+def unregister():
+    bpy.utils.unregister_class(ScribeApplyReport)
@@ -0,0 +1,84 @@
+"""
+report.py: Read the values back out of a Scribe settings report.
+
+This module doesn't depend on bpy so reports can be read outside of blender.
+
+Copyright (C) 2017 Isaac Weaver
+Author: Isaac Weaver <wisaac407@gmail.com>
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with this program; if not, write to the Free Software Foundation, Inc.,
+    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+
+from collections import OrderedDict
+
+try:
+    from scribe.frame_log import MAGIC, FrameLogReader
+except ImportError:  # Used outside of blender, where the scribe package can't be imported.
+    from frame_log import MAGIC, FrameLogReader
+
+
+class Report:
+    """
+    The values stored in a report or frame log.
+
+    Text reports only have the hook labels, so their values are keyed by
+    (group label, hook label). Frame logs store the settings by hook idname.
+    """
+
+    def __init__(self):
+        self.values = OrderedDict()  # (group label, hook label) -> raw value
+        self.settings = OrderedDict()  # hook idname -> raw value
+        self.settings_hash = None
+
+
+def parse_report(lines):
+    """Parse the lines of a text report into a Report."""
+    report = Report()
+    group = None
+    header = None  # Line that might be a group header, confirmed by the rule after it.
+    for line in lines:
+        line = line.strip()
+        if not line:
+            group = None  # Groups end with a blank line.
+        elif group is None:
+            if header is not None and line.startswith('=' * 10):
+                group = header.rstrip(':')
+            elif line.startswith('Settings hash: '):
+                report.settings_hash = line.partition(': ')[2]
+            header = line
+            continue
+        else:
+            label, sep, raw = line.partition(': ')
+            if sep:
+                report.values[(group, label)] = raw
+        header = None
+    return report
+
+
+def read_report(path):
+    """Read a text report or a frame log into a Report."""
+    with open(path, 'rb') as f:
+        is_frame_log = f.read(len(MAGIC)) == MAGIC
+
+    if is_frame_log:
+        report = Report()
+        with FrameLogReader(path) as reader:
+            report.settings.update(sorted(reader.meta.get('settings', {}).items()))
+            report.settings_hash = reader.meta.get('settings_hash')
+        return report
+
+    with open(path) as f:
+        return parse_report(f)
@@ -0,0 +1,185 @@
+"""
+sinks.py: Render sinks that consume per-frame records while rendering.
+
+Copyright (C) 2017 Isaac Weaver
+Author: Isaac Weaver <wisaac407@gmail.com>
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with this program; if not, write to the Free Software Foundation, Inc.,
+    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+
+import time
+import bpy
+
+from scribe.renderer import RenderSink, register_sink, unregister_sink
+from scribe.frame_log import FrameLogWriter
+from scribe.metrics import MetricsWriter, current_rss
+from scribe.event_stream import get_server
+from scribe.hooks import hardware
+
+
+class FrameLogSink(RenderSink):
+    """Write every frame record to a binary frame log next to the settings file."""
+
+    @classmethod
+    def poll(cls, renderer):
+        # The frame table in the report is read back from the frame log.
+        return renderer.option('frame_log') or renderer.option('frame_table')
+
+    def __init__(self, renderer):
+        super().__init__(renderer)
+        self.path = renderer.output_path('.frames')
+        self.writer = None
+
+    def meta(self):
+        scene = self.renderer.scene
+        meta = {
+            'scene': scene.name,
+            'blend': bpy.data.filepath,
+            'created': time.time(),
+            'fps': scene.render.fps / scene.render.fps_base,
+            'frame_start': scene.frame_start,
+            'frame_end': scene.frame_end,
+            'frame_step': scene.frame_step,
+            'settings': self.renderer.settings(),
+            'settings_hash': self.renderer.settings_hash(),
+        }
+        # Keep what's needed to compare frame times across nodes.
+        calibration = self.renderer.get_hook('hw_calibration')
+        if calibration is not None:
+            meta['hardware'] = hardware.fingerprint()
+            meta['devices'] = calibration.devices
+            if calibration.score is not None:  # Only CPU renders have a score.
+                meta['calibration_score'] = calibration.score
+                meta['calibration_cores'] = calibration.cores
+        return meta
+
+    def frame_complete(self, row):
+        # Open the log lazily, the output directory might not exist before the first frame.
+        if self.writer is None:
+            self.writer = FrameLogWriter(self.path, self.renderer.frame_fields, self.meta())
+        self.writer.write(row)
+
+    def render_complete(self):
+        if self.writer is not None:
+            self.writer.close()
+
+    def render_cancel(self):
+        # Keep the partial log, the frames of a render stopped early are the interesting ones.
+        # The reader can tell it's incomplete from the missing trailing records.
+        if self.writer is not None:
+            self.writer.close()
+
+
+class MetricsSink(RenderSink):
+    """Keep an OpenMetrics textfile up to date with the render progress."""
+
+    @classmethod
+    def poll(cls, renderer):
+        return renderer.option('metrics')
+
+    def __init__(self, renderer):
+        super().__init__(renderer)
+        scene = renderer.scene
+        path = bpy.path.abspath(renderer.option('metrics_path')) or renderer.output_path('.prom')
+        self.writer = MetricsWriter(path, {'scene': scene.name}, renderer.option('metrics_interval'))
+        self.frames_total = len(range(scene.frame_start, scene.frame_end + 1, scene.frame_step))
+        self.total_time = 0
+        self.frame = scene.frame_current
+        self.write(1)  # Let the dashboards know the render started.
+
+    def write(self, rendering):
+        renderer = self.renderer
+        done = renderer.frames_done
+        average = self.total_time / done if done else None
+        eta = average * max(self.frames_total - done, 0) if done else None
+        self.writer.update(
+            rendering=rendering,
+            frame_current=self.frame,
+            frames_done=done,
+            frames_total=self.frames_total,
+            frame_seconds_last=renderer.last_frame_time if done else None,
+            frame_seconds_average=average,
+            eta_seconds=eta if rendering else 0,
+            rss_bytes=current_rss(),
+        )
+
+    def frame_complete(self, row):
+        self.frame = row[0]
+        self.total_time += row[1]
+        if self.writer.due():
+            self.write(1)
+
+    def render_complete(self):
+        self.write(0)
+
+    def render_cancel(self):
+        self.write(0)
+
+
+class EventStreamSink(RenderSink):
+    """Publish render events to the local event stream."""
+
+    @classmethod
+    def poll(cls, renderer):
+        return renderer.option('stream')
+
+    def __init__(self, renderer):
+        super().__init__(renderer)
+        scene = renderer.scene
+        self.scene_name = scene.name
+        address = renderer.option('stream_address')
+        try:
+            self.server = get_server(address)
+        except (OSError, ValueError) as e:
+            # Never fail a render because of the stream.
+            print('Scribe: Could not start the event stream on %s: %s' % (address, e))
+            self.server = None
+        self.publish('render_start', blend=bpy.data.filepath, frame_start=scene.frame_start,
+                     frame_end=scene.frame_end, frame_step=scene.frame_step,
+                     settings_hash=renderer.settings_hash())
+
+    def publish(self, event, **data):
+        if self.server is not None:
+            self.server.publish(event, scene=self.scene_name, **data)
+
+    def frame_begin(self):
+        self.publish('frame_start', frame=self.renderer.scene.frame_current)
+
+    def frame_complete(self, row):
+        fields = self.renderer.frame_fields
+        self.publish('frame_end', frames_done=self.renderer.frames_done,
+                     **dict((name, value) for (name, _), value in zip(fields, row)))
+
+    def frame_write(self):
+        self.publish('write', frame=self.renderer.scene.frame_current)
+
+    def render_complete(self):
+        self.publish('complete', frames_done=self.renderer.frames_done)
+
+    def render_cancel(self):
+        self.publish('cancel', frames_done=self.renderer.frames_done)
+
+
+def register():
+    register_sink(FrameLogSink)
+    register_sink(MetricsSink)
+    register_sink(EventStreamSink)
+
+
+def unregister():
+    unregister_sink(FrameLogSink)
+    unregister_sink(MetricsSink)
+    unregister_sink(EventStreamSink)
@@ -0,0 +1,193 @@
+"""
+sweep.py: Render a short frame range across a grid of performance settings and rank them.
+
+Every variant is rendered as a normal animation, so it's recorded by the Renderer
+like any other render and its frame times are read back from its frame log. Runs
+headless, i.e.:
+
+    blender -b shot.blend --python-expr "from scribe import sweep; sweep.main()" -- \\
+        --sweep-frames 1 3 --sweep-tiles 16 32 64 --sweep-threads 4 8 --sweep-samples 64 128
+
+Copyright (C) 2017 Isaac Weaver
+Author: Isaac Weaver <wisaac407@gmail.com>
+
+    This program is free software; you can redistribute it and/or modify
+    it under the terms of the GNU General Public License as published by
+    the Free Software Foundation; either version 2 of the License, or
+    (at your option) any later version.
+
+    This program is distributed in the hope that it will be useful,
+    but WITHOUT ANY WARRANTY; without even the implied warranty of
+    MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+    GNU General Public License for more details.
+
+    You should have received a copy of the GNU General Public License along
+    with this program; if not, write to the Free Software Foundation, Inc.,
+    51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+"""
+
+
+import argparse
+import itertools
+import os
+import sys
+
+import bpy
+
+from scribe.config import force
+from scribe.frame_log import FrameLogReader
+from scribe.hooks.general import TrueResolutionHook
+from scribe.renderer import output_path
+
+
+class SweepResult:
+    """Timings of a single combination of settings."""
+
+    def __init__(self, tile, threads, samples, frame_times, pixels):
+        self.tile = tile
+        self.threads = threads
+        self.samples = samples
+        self.frames = len(frame_times)
+        total = sum(frame_times)
+        self.seconds_per_frame = total / self.frames if self.frames else float('inf')
+        self.megapixels_per_sec = pixels * self.frames / total / 1e6 if total else 0.0
+
+    def label(self):
+        label = 'tile %sx%s, %s threads' % (self.tile, self.tile, self.threads)
+        if self.samples is not None:
+            label += ', %s samples' % self.samples
+        return label
+
+
+def _variants(scene, tile_sizes, threads, samples):
+    """Return the grid of (tile, threads, samples), using the current value for every empty axis."""
+    tile_sizes = tile_sizes or [scene.render.tile_x]
+    threads = threads or [scene.render.threads]
+    if scene.render.engine == 'CYCLES':
+        samples = samples or [scene.cycles.samples]
+    else:
+        samples = [None]  # Only cycles has a sample count.
+    return list(itertools.product(tile_sizes, threads, samples))
+
+
+def _apply_variant(scene, tile, threads, samples):
+    scene.render.tile_x = scene.render.tile_y = tile
+    scene.render.threads = threads
+    if samples is not None:
+        scene.cycles.samples = samples
+
+
+def rank(results):
+    """
+    Return the results grouped by sample count (in increasing order), fastest first within every group.
+
+    The sample count changes the quality, not just the speed, so only the tile and
+    thread variants of the same sample count are ranked against each other.
+    """
+    groups = itertools.groupby(sorted(results, key=lambda result: (result.samples or 0, result.seconds_per_frame)),
+                               key=lambda result: result.samples)
+    return [(samples, list(group)) for samples, group in groups]
+
+
+def format_table(ranked):
+    """Return the ranked results (see rank()) as a text table with the best combination per sample count."""
+    lines = ['%4s  %9s  %7s  %7s  %10s  %8s' % ('Rank', 'Tile', 'Threads', 'Samples', 'Sec/Frame', 'MP/s'),
+             '=' * 56]
+    best = []
+    for samples, results in ranked:
+        for i, result in enumerate(results, 1):
+            lines.append('%4s  %9s  %7s  %7s  %10.3f  %8.3f' % (
+                i, '%sx%s' % (result.tile, result.tile), result.threads,
+                '-' if samples is None else samples,
+                result.seconds_per_frame, result.megapixels_per_sec))
+        best.append(results[0])
+    if best:
+        lines.append('')
+        for result in best:
+            lines.append('Best: %s' % result.label())
+    return '\n'.join(lines) + '\n'
+
+
+def run_sweep(scene, frame_start, frame_end, tile_sizes=(), threads=(), samples=(),
+              output_dir='//scribe_sweep/'):
+    """
+    Render frame_start - frame_end once for every combination of the given settings.
+
+    Returns the results ranked within every sample count (see rank()) and writes the
+    ranked table to perf_sweep.txt in output_dir. The scene settings are restored
+    afterwards.
+
+    A single warm-up frame is rendered and discarded first, so one-time costs like
+    loading or compiling the kernels aren't charged to the first variant.
+    """
+    render = scene.render
+    output_dir = bpy.path.abspath(output_dir)
+
+    # Everything we touch, so it can be put back the way it was.
+    saved = [(render, 'tile_x'), (render, 'tile_y'), (render, 'threads_mode'), (render, 'threads'),
+             (render, 'filepath'), (render, 'use_overwrite'), (render, 'use_placeholder'),
+             (scene, 'frame_start'), (scene, 'frame_end')]
+    if render.engine == 'CYCLES':
+        saved.append((scene.cycles, 'samples'))
+    saved = [(owner, attr, getattr(owner, attr)) for owner, attr in saved]
+
+    results = []
+    try:
+        # Forced so the command line and environment (i.e. SCRIBE_SINKS without frames) can't turn the log off.
+        with force(enable=True, frame_log=True):
+            # Read the defaults first: in auto mode render.threads is the system thread count,
+            # once the mode is fixed it's the stored count (usually 1).
+            x, y = TrueResolutionHook.true_resolution(scene)
+            variants = _variants(scene, tile_sizes, threads, samples)
+
+            scene.frame_start = frame_start
+            scene.frame_end = frame_end
+            render.use_overwrite = True
+            render.use_placeholder = False
+            render.threads_mode = 'FIXED'
+
+            print('Scribe: Sweep warm-up')
+            _apply_variant(scene, *variants[0])
+            render.filepath = os.path.join(output_dir, 'warmup', '')
+            scene.frame_end = frame_start
+            bpy.ops.render.render(animation=True, scene=scene.name)
+            scene.frame_end = frame_end
+
+            for i, (tile, thread_count, sample_count) in enumerate(variants):
+                print('Scribe: Sweep variant %s of %s' % (i + 1, len(variants)))
+                _apply_variant(scene, tile, thread_count, sample_count)
+                render.filepath = os.path.join(output_dir, 'variant_%03d' % i, '')
+
+                bpy.ops.render.render(animation=True, scene=scene.name)
+
+                with FrameLogReader(output_path(scene, '.frames')) as reader:
+                    frame_times = list(reader.column('frame_time'))
+                results.append(SweepResult(tile, thread_count, sample_count, frame_times, x * y))
+    finally:
+        for owner, attr, value in saved:
+            setattr(owner, attr, value)
+
+    ranked = rank(results)
+    table = format_table(ranked)
+    print(table)
+    with open(os.path.join(output_dir, 'perf_sweep.txt'), 'w') as f:
+        f.write(table)
+    return ranked
+
+
+def main(argv=None):
+    """Run a sweep from the command line arguments after '--'."""
+    if argv is None:
+        argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+
+    parser = argparse.ArgumentParser(prog='scribe.sweep', description="Scribe render settings sweep.")
+    parser.add_argument('--sweep-frames', nargs=2, type=int, metavar=('START', 'END'), required=True,
+                        help="Frame range to render for every variant.")
+    parser.add_argument('--sweep-tiles', nargs='+', type=int, default=[], help="Tile sizes to try.")
+    parser.add_argument('--sweep-threads', nargs='+', type=int, default=[], help="Thread counts to try.")
+    parser.add_argument('--sweep-samples', nargs='+', type=int, default=[], help="Sample counts to try.")
+    parser.add_argument('--sweep-output', default='//scribe_sweep/', help="Directory for the sweep renders.")
+    args, _ = parser.parse_known_args(argv)
+
+    return run_sweep(bpy.context.scene, args.sweep_frames[0], args.sweep_frames[1],
+                     args.sweep_tiles, args.sweep_threads, args.sweep_samples, args.sweep_output)